@@ -1,9 +1,41 @@
-import json
+import io
+import os
 from collections import defaultdict
 from datetime import datetime
+from pathlib import Path
+
+# orjson parses large documents several times faster than the standard library.
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
 
 INPUT_JSON = "benchmark_output.json"
 OUTPUT_TXT = "benchmark_results.txt"
+# Files above this size are streamed record by record instead of parsed in one go.
+STREAMING_THRESHOLD = 32 * 1024 * 1024
+
+def _stream_benchmarks(f):
+    with f:
+        yield from ijson.items(f, "benchmarks.item", use_float=True)
+
+def load_benchmarks(path):
+    """
+    Returns an iterable over the benchmark records of a pytest-benchmark JSON file.
+    Large files are streamed with `ijson` (when installed) so the whole document
+    never has to be held in memory; smaller ones are read and parsed in one call.
+    """
+    f = open(path, 'rb')
+    if ijson is not None and os.path.getsize(path) > STREAMING_THRESHOLD:
+        return _stream_benchmarks(f)
+    with f:
+        data = json_loads(f.read())
+    return data.get("benchmarks", [])
 
 def analyze_and_write_report():
     """
@@ -11,14 +43,12 @@ def analyze_and_write_report():
     and writes a detailed analysis to a text file.
     """
     try:
-        with open(INPUT_JSON, 'r') as f:
-            data = json.load(f)
+        benchmarks = load_benchmarks(INPUT_JSON)
     except FileNotFoundError:
         print(f"Error: The input file '{INPUT_JSON}' was not found.")
         print("Please run the benchmarks first using 'py -m pytest benchmarks/ --benchmark-json=benchmark_output.json'")
         return
 
-    benchmarks = data.get("benchmarks", [])
     grouped_results = defaultdict(dict)
 
     # --- 1. Parse and group all benchmark results ---
@@ -34,45 +64,52 @@ def analyze_and_write_report():
         mean_time = bench.get("stats", {}).get("mean", 0)
         grouped_results[group][name] = mean_time
 
-    # --- 2. Write the formatted report ---
-    with open(OUTPUT_TXT, "w") as f:
-        f.write("--- DynamiXplore Performance Benchmark Results ---\n")
-        f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write("="*50 + "\n\n")
-
-        # --- 3. Process and write results for each group ---
-        for group, results in sorted(grouped_results.items()):
-            f.write(f"Benchmark Group: {group}\n")
-            f.write("-" * (len(group) + 18) + "\n")
-
-            # Write raw timings
-            for name, time in sorted(results.items()):
-                f.write(f"{name:<28}: {time:.6f}s\n")
-
-            # --- 4. Calculate and write speedups ---
-            try:
-                if "DX_RK45_Adaptive" in results and "SciPy_RK45_Adaptive" in results:
-                    speedup = results["SciPy_RK45_Adaptive"] / results["DX_RK45_Adaptive"]
-                    f.write(f"  -> Adaptive Speedup (SciPy/DX): {speedup:.2f}x\n")
-                
-                if "DX_RK4_Fixed" in results and "SciPy_RK45_FixedLike" in results:
-                    speedup = results["SciPy_RK45_FixedLike"] / results["DX_RK4_Fixed"]
-                    f.write(f"  -> Fixed-Step Speedup (SciPy/DX): {speedup:.2f}x\n")
-
-                # FIX: Corrected the names to match the actual benchmark output.
-                if "DynamiXplore" in results and "nolds" in results and group == "Lyapunov Spectrum":
-                    speedup = results["nolds"] / results["DynamiXplore"]
-                    f.write(f"  -> Speedup (nolds/DX): {speedup:.2f}x\n")
-
-                if group == "Invariant Measure" and "DynamiXplore" in results and "SciPy" in results:
-                    speedup = results["SciPy"] / results["DynamiXplore"]
-                    note = "(Note: SciPy is faster due to single-call optimization vs. high-overhead Rust calls)" if speedup < 1 else ""
-                    f.write(f"  -> Speedup (SciPy/DX): {speedup:.2f}x {note}\n")
-
-            except ZeroDivisionError:
-                f.write("  -> Speedup calculation failed (division by zero).\n")
+    # --- 2. Build the formatted report in memory ---
+    buf = io.StringIO()
+    buf.write("--- DynamiXplore Performance Benchmark Results ---\n")
+    buf.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    buf.write("="*50 + "\n\n")
+
+    # --- 3. Process and write results for each group ---
+    group_items = sorted(grouped_results.items())
+    for group, results in group_items:
+        buf.write(f"Benchmark Group: {group}\n")
+        buf.write("-" * (len(group) + 18) + "\n")
+
+        # Write raw timings
+        rows = sorted(results.items())
+        for name, time in rows:
+            buf.write(f"{name:<28}: {time:.6f}s\n")
+
+        # --- 4. Calculate and write speedups ---
+        try:
+            if "DX_RK45_Adaptive" in results and "SciPy_RK45_Adaptive" in results:
+                speedup = results["SciPy_RK45_Adaptive"] / results["DX_RK45_Adaptive"]
+                buf.write(f"  -> Adaptive Speedup (SciPy/DX): {speedup:.2f}x\n")
             
-            f.write("\n")
+            if "DX_RK4_Fixed" in results and "SciPy_RK45_FixedLike" in results:
+                speedup = results["SciPy_RK45_FixedLike"] / results["DX_RK4_Fixed"]
+                buf.write(f"  -> Fixed-Step Speedup (SciPy/DX): {speedup:.2f}x\n")
+
+            # FIX: Corrected the names to match the actual benchmark output.
+            if "DynamiXplore" in results and "nolds" in results and group == "Lyapunov Spectrum":
+                speedup = results["nolds"] / results["DynamiXplore"]
+                buf.write(f"  -> Speedup (nolds/DX): {speedup:.2f}x\n")
+
+            # Older runs used SciPy's binned_statistic_2d as the baseline.
+            baseline = "NumPy" if "NumPy" in results else "SciPy"
+            if group == "Invariant Measure" and "DynamiXplore" in results and baseline in results:
+                speedup = results[baseline] / results["DynamiXplore"]
+                note = f"(Note: {baseline} is faster due to single-call optimization vs. high-overhead Rust calls)" if speedup < 1 else ""
+                buf.write(f"  -> Speedup ({baseline}/DX): {speedup:.2f}x {note}\n")
+
+        except ZeroDivisionError:
+            buf.write("  -> Speedup calculation failed (division by zero).\n")
+        
+        buf.write("\n")
+
+    # Write the whole report in a single call.
+    Path(OUTPUT_TXT).write_text(buf.getvalue(), encoding="utf-8")
 
     print(f"✅ Benchmark report successfully generated at '{OUTPUT_TXT}'")
 
@@ -2,7 +2,6 @@ import pytest
 import numpy as np
 import dynamixplore as dx
 import nolds
-from scipy.stats import binned_statistic_2d
 from .systems import lorenz_system
 
 # --- Fixture to generate a standard Analysis object for all tests ---
@@ -24,10 +23,22 @@ def lorenz_analysis_object():
     analysis_obj = dx.Analysis(trajectory=trajectory, dt=0.01)
     return analysis_obj
 
+@pytest.fixture(scope="module")
+def lorenz_xz_columns(lorenz_analysis_object):
+    """
+    Unit-stride copies of the x and z columns of the Lorenz trajectory, made once
+    so the baseline benchmarks don't re-gather them from the (N, 3) array.
+    """
+    trajectory = lorenz_analysis_object.trajectory
+    return {
+        "x": np.ascontiguousarray(trajectory[:, 0]),
+        "z": np.ascontiguousarray(trajectory[:, 2]),
+    }
+
 # --- Benchmark Functions ---
 
 # FIX: Parametrize over the functions to benchmark to avoid FixtureAlreadyUsed error.
-@pytest.mark.parametrize("method", ["DynamiXplore", "nolds"])
+@pytest.mark.parametrize("method", ["DynamiXplore", "DynamiXplore (built-in)", "nolds"])
 def test_lyapunov_benchmark(benchmark, lorenz_analysis_object, method):
     """Benchmarks Lyapunov spectrum calculation vs. nolds."""
     # FIX: Pass the correct 1D array to the nolds function.
@@ -37,13 +48,18 @@ def test_lyapunov_benchmark(benchmark, lorenz_analysis_object, method):
     benchmark.group = "Lyapunov Spectrum"
     benchmark.name = method
 
-    if method == "DynamiXplore":
+    if method.startswith("DynamiXplore"):
+        # "DynamiXplore" keeps timing the Python-callback path, so it stays comparable
+        # with earlier runs; the built-in case times the compiled Lorenz RHS.
+        system = dict(kind="lorenz") if method.endswith("(built-in)") else dict(dynamics=lorenz_system)
         def run_dx_lyapunov():
+            # Results are memoized per Analysis; clear them so every round computes.
+            lorenz_analysis_object.clear_cache()
             lorenz_analysis_object.lyapunov_spectrum(
-                dynamics=lorenz_system,
                 t_transient=10.0,
                 t_total=1000.0,
-                t_reorth=1.0
+                t_reorth=1.0,
+                **system
             )
         benchmark(run_dx_lyapunov)
     
@@ -64,10 +80,9 @@ def test_entropy_benchmark(benchmark, lorenz_analysis_object):
     benchmark(run_dx_entropy)
 
 # FIX: Parametrize over the functions to benchmark.
-@pytest.mark.parametrize("method", ["DynamiXplore", "SciPy"])
-def test_invariant_measure_benchmark(benchmark, lorenz_analysis_object, method):
-    """Benchmarks invariant measure calculation vs. SciPy."""
-    traj_xz = lorenz_analysis_object.trajectory[:, [0, 2]]
+@pytest.mark.parametrize("method", ["DynamiXplore", "NumPy"])
+def test_invariant_measure_benchmark(benchmark, lorenz_analysis_object, lorenz_xz_columns, method):
+    """Benchmarks invariant measure calculation vs. a NumPy 2D histogram."""
     epsilon = 0.5
     
     benchmark.group = "Invariant Measure"
@@ -78,11 +93,13 @@ def test_invariant_measure_benchmark(benchmark, lorenz_analysis_object, method):
             lorenz_analysis_object.invariant_measure(epsilon=epsilon, dims=(0, 2))
         benchmark(run_dx_measure)
 
-    elif method == "SciPy":
-        def run_scipy_measure():
-            x_min, x_max = traj_xz[:, 0].min(), traj_xz[:, 0].max()
-            z_min, z_max = traj_xz[:, 1].min(), traj_xz[:, 1].max()
-            bins_x = np.arange(x_min, x_max, epsilon)
-            bins_z = np.arange(z_min, z_max, epsilon)
-            binned_statistic_2d(traj_xz[:, 0], traj_xz[:, 1], None, 'count', bins=[bins_x, bins_z])
-        benchmark(run_scipy_measure)
+    elif method == "NumPy":
+        # The bin edges are constant across rounds, so only the binning is timed.
+        x_col = lorenz_xz_columns["x"]
+        z_col = lorenz_xz_columns["z"]
+        bins_x = np.arange(x_col.min(), x_col.max(), epsilon)
+        bins_z = np.arange(z_col.min(), z_col.max(), epsilon)
+
+        def run_numpy_measure():
+            np.histogram2d(x_col, z_col, bins=[bins_x, bins_z])
+        benchmark(run_numpy_measure)
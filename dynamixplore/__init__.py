@@ -4,7 +4,14 @@ of complex dynamical systems.
 """
 
 # Imports the Rust stuff. Plz no remove.
-from .dynamixplore import * 
+# Only the `_core` submodule is needed; importing it by name avoids a wildcard walk
+# over the extension module's attributes on every `import dynamixplore`.
+# If the extension has not been compiled, `_core` is None and the pure-NumPy
+# fallbacks in `analysis` are used where they exist.
+try:
+    from .dynamixplore import _core
+except ImportError:
+    _core = None
 # 
 # dynamixplore
 #    |- dx_core (Rust)
@@ -17,12 +24,12 @@ from .dynamixplore import *
 # This file defines the public API of the dynamixplore package.
 # It imports the main user-facing classes from the sub-modules.
 
-from .simulation import Simulation
+from .simulation import Simulation, Solver, register_rhs
 from .analysis import Analysis
 from .visualize import plot_phase_portrait, plot_invariant_measure
 
 # Define __all__ to specify what `from dynamixplore import *` should import.
-__all__ = ["_core", "Simulation", "Analysis", "plot_phase_portrait", "plot_invariant_measure"]
+__all__ = ["_core", "Simulation", "Solver", "register_rhs", "Analysis", "plot_phase_portrait", "plot_invariant_measure"]
 
 # Define __version__ for easy access by users and packaging tools.
 __version__ = "0.6.0"
@@ -1,14 +1,188 @@
+import math
 import numpy as np
-import pandas as pd
-from typing import Optional, Callable, List, Tuple
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import TYPE_CHECKING, Optional, Callable, List, Sequence, Tuple
+
+# pandas is only needed by `to_dataframe`, so it is imported there on first use
+# rather than paying its import cost on every `import dynamixplore`.
+if TYPE_CHECKING:
+    import pandas as pd
 
 # This relative import is safe because there are no more circular dependencies.
+# `rust_core` is None when the extension has not been compiled.
 from dynamixplore import _core as rust_core
 
+# Numba is optional; without it the NumPy permutation-entropy fallback is used.
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Factorials and their logs for the permutation-entropy fallbacks, looked up by `m`
+# instead of being recomputed per call. The limits match the Rust core: Lehmer codes
+# of up to `_MAX_M` = 20 samples still fit in an int64, but a dense m! count table is
+# only used up to `_MAX_DENSE_M` (9! entries would already be 2.9 MB).
+_MAX_M = 20
+_MAX_DENSE_M = 8
+_FACT = tuple(math.factorial(i) for i in range(_MAX_M + 1))
+_LOG_FACT = tuple(math.log(f) for f in _FACT)
+
+# Upper bound on the (windows, m, m) comparison temporary of `_perm_entropy_numpy`.
+_PERM_BLOCK_ELEMENTS = 1 << 22
+
+
+def _check_perm_args(m: int, tau: int) -> None:
+    if m < 2:
+        raise ValueError("Embedding dimension 'm' must be at least 2.")
+    if m > _MAX_M:
+        raise ValueError(f"Embedding dimension 'm' must be at most {_MAX_M}.")
+    if tau < 1:
+        raise ValueError("Time delay 'tau' must be at least 1.")
+
+
+def _perm_entropy_numpy(x: np.ndarray, m: int, tau: int) -> float:
+    """
+    Pure-NumPy permutation entropy, normalized to [0, 1].
+
+    Used when the Rust core is unavailable and as a reference for it. Each delay
+    vector is mapped to the Lehmer code of its ordinal pattern (ties broken by
+    position, like the Rust kernel) and the codes are counted with `np.unique`, so
+    there is no per-window Python work and memory follows the patterns actually seen
+    rather than all m! of them. The pairwise comparisons are done in blocks of
+    windows to bound their (block, m, m) temporary.
+    """
+    _check_perm_args(m, tau)
+
+    x = np.asarray(x, dtype=np.float64)
+    span = (m - 1) * tau + 1
+    if x.shape[0] < span:
+        return 0.0
+
+    # (N - (m-1)*tau, m) view of the delay vectors; no data is copied here.
+    windows = sliding_window_view(x, span)[:, ::tau]
+    n_windows = windows.shape[0]
+
+    # Lehmer code: for each position, how many later samples are strictly smaller,
+    # weighted by the factorial number system.
+    later = np.triu(np.ones((m, m), dtype=bool), k=1)
+    weights = np.array(_FACT[m - 1::-1], dtype=np.int64)
+    block = max(1, _PERM_BLOCK_ELEMENTS // (m * m))
+    codes = np.empty(n_windows, dtype=np.int64)
+    for start in range(0, n_windows, block):
+        w = windows[start:start + block]
+        inversions = ((w[:, None, :] < w[:, :, None]) & later).sum(axis=2)
+        codes[start:start + block] = inversions @ weights
+
+    _, counts = np.unique(codes, return_counts=True)
+    p = counts / n_windows
+    return float((p * np.log(1.0 / p)).sum() / _LOG_FACT[m])
+
+
+def _perm_entropy_kernel(x, m, tau):
+    """
+    Numba kernel for permutation entropy, normalized to [0, 1].
+
+    Computes the same Lehmer codes as `_perm_entropy_numpy`, but directly from
+    pairwise comparisons within each window: position j contributes the number of
+    later samples strictly smaller than it (so ties rank by position). No rank
+    arrays are materialized. Arguments are assumed validated by the caller.
+
+    Up to `_MAX_DENSE_M` the codes are counted in a dense m! table; above it they
+    are sorted and counted in runs, so memory follows the number of windows.
+    """
+    n_windows = x.shape[0] - (m - 1) * tau
+    if n_windows <= 0:
+        return 0.0
+
+    dense = m <= _MAX_DENSE_M
+    counts = np.zeros(_FACT[m] if dense else 0, dtype=np.int64)
+    codes = np.empty(0 if dense else n_windows, dtype=np.int64)
+
+    for i in range(n_windows):
+        code = 0
+        for j in range(m):
+            x_j = x[i + j * tau]
+            smaller = 0
+            for k in range(j + 1, m):
+                if x[i + k * tau] < x_j:
+                    smaller += 1
+            # Horner evaluation of the factorial-base number.
+            code = code * (m - j) + smaller
+        if dense:
+            counts[code] += 1
+        else:
+            codes[i] = code
+
+    entropy = 0.0
+    if dense:
+        for c in counts:
+            if c > 0:
+                p = c / n_windows
+                entropy -= p * math.log(p)
+    else:
+        codes.sort()
+        run = 1
+        for i in range(1, n_windows):
+            if codes[i] == codes[i - 1]:
+                run += 1
+            else:
+                p = run / n_windows
+                entropy -= p * math.log(p)
+                run = 1
+        p = run / n_windows
+        entropy -= p * math.log(p)
+    return entropy / _LOG_FACT[m]
+
+
+_perm_entropy_nb = njit(cache=True)(_perm_entropy_kernel) if njit is not None else None
+
+
+def _boxes_to_grid(x_idx: np.ndarray, y_idx: np.ndarray, counts: np.ndarray,
+                   epsilon: float, sparse: bool) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Scatters occupied-box triplets from the Rust core into `(histogram, x_bins, y_bins)`.
+    """
+    if counts.size == 0:
+        return np.array([[]]), np.array([]), np.array([])
+
+    # Python ints: the indices are int32 and the grid extent (or `x_max + 1`) may not be.
+    x_min, x_max = int(x_idx.min()), int(x_idx.max())
+    y_min, y_max = int(y_idx.min()), int(y_idx.max())
+    grid_shape = (x_max - x_min + 1, y_max - y_min + 1)
+
+    if sparse:
+        from scipy.sparse import coo_matrix
+        # Offsets in int64, as a sparse grid can span more than 2^31 boxes per axis.
+        rows = x_idx.astype(np.int64) - x_min
+        cols = y_idx.astype(np.int64) - y_min
+        hist = coo_matrix((counts, (rows, cols)), shape=grid_shape)
+    else:
+        hist = np.zeros(grid_shape, dtype=np.uint64)
+        hist[x_idx - x_min, y_idx - y_min] = counts
+
+    # Edges straight from the endpoints: one allocation per axis, exact first/last edge.
+    gx, gy = grid_shape
+    x_bins = np.linspace(x_min * epsilon, (x_max + 1) * epsilon, gx + 1)
+    y_bins = np.linspace(y_min * epsilon, (y_max + 1) * epsilon, gy + 1)
+
+    return hist, x_bins, y_bins
+
+
 class Analysis:
     """
     A class to perform analysis on the trajectory of a dynamical system.
+
+    The trajectory is copied when the object is built and exposed read-only, so
+    later changes to the array passed in are not seen; build a new Analysis to
+    analyse modified data.
     """
+    # Slots instead of a per-instance __dict__: sweeps create many Analysis objects.
+    __slots__ = (
+        'trajectory', 't', 'dt', 'n_points', 'n_dims',
+        '_traj_soa', '_time_axis', '_lyap_cache',
+        '_lyapunov', '_entropy', '_stats'
+    )
+
     def __init__(self, trajectory: np.ndarray, t: Optional[np.ndarray] = None, dt: Optional[float] = None):
         if not isinstance(trajectory, np.ndarray) or trajectory.ndim != 2:
             raise ValueError("Trajectory must be a 2D NumPy array.")
@@ -16,78 +190,184 @@ class Analysis:
         if t is None and dt is None:
             raise ValueError("Time information is required ('t' or 'dt').")
 
-        self.trajectory = trajectory
+        # Structure-of-arrays copy, shape (n_dims, n_points): each row is one contiguous
+        # dimension, so per-dimension slices reach the Rust core without a temporary copy.
+        # Always a copy, so later writes to the caller's array do not reach it, and the
+        # only one kept: `trajectory` is a read-only transposed view of it.
+        self._traj_soa = np.array(trajectory.T, order='C')
+        self._traj_soa.setflags(write=False)
+        self.trajectory = self._traj_soa.T
         self.t = t
         self.dt = dt
+        # Time axis shared by `to_dataframe` calls; built from `dt` on first use if `t` is absent.
+        self._time_axis = t
+        # Memoized `lyapunov_spectrum` results, see `clear_cache`.
+        self._lyap_cache = {}
+        # Backing slots for the lazily built solver properties below.
+        self._lyapunov = self._entropy = self._stats = None
         self.n_points, self.n_dims = trajectory.shape
 
-        self._lyapunov_solver = rust_core.Lyapunov()
-        self._entropy_solver = rust_core.Entropy()
-        self._stats_solver = rust_core.Stats()
+    # The Rust solvers are built on first use, so an Analysis that is only turned into
+    # a DataFrame (or never analysed at all) pays no PyO3 constructor calls. Each is
+    # None when the compiled core is unavailable.
+    @property
+    def _lyapunov_solver(self):
+        if self._lyapunov is None and rust_core is not None:
+            self._lyapunov = rust_core.Lyapunov()
+        return self._lyapunov
+
+    @property
+    def _entropy_solver(self):
+        if self._entropy is None and rust_core is not None:
+            self._entropy = rust_core.Entropy()
+        return self._entropy
+
+    @property
+    def _stats_solver(self):
+        if self._stats is None and rust_core is not None:
+            self._stats = rust_core.Stats()
+        return self._stats
 
     def lyapunov_spectrum(
         self,
-        dynamics: Callable,
+        dynamics: Optional[Callable] = None,
         t_transient: float = 100.0,
         t_total: float = 1000.0,
         t_reorth: float = 0.5,
         h_init: float = 0.01,
         abstol: float = 1e-6,
-        reltol: float = 1e-3
+        reltol: float = 1e-3,
+        *,
+        kind: Optional[str] = None,
+        jacobian: Optional[Callable[[float, np.ndarray], np.ndarray]] = None
     ) -> Tuple[np.ndarray, np.ndarray]:
-        initial_state = np.ascontiguousarray(self.trajectory[-1, :])
-        return self._lyapunov_solver.compute_spectrum(
-            dynamics, initial_state, t_transient, t_total,
-            t_reorth, h_init, abstol, reltol
+        """
+        Computes the Lyapunov spectrum starting from the last point of the trajectory.
+
+        If `kind` names a system built into the Rust core ('lorenz' or 'rossler'),
+        its compiled right-hand side is used instead of `dynamics`. This avoids a
+        Python callback per RHS evaluation and runs without holding the GIL.
+
+        If `jacobian` is given, it is called as `jacobian(t, y)` and must return a
+        float64 array of shape `(n_dims, n_dims)` with `J[i, j] = ∂f_i/∂y_j`. The
+        tangent space is then evolved with the variational equation `dΦ/dt = J Φ`,
+        costing one `dynamics` and one `jacobian` call per RHS evaluation instead of
+        integrating `n_dims` extra finite-difference trajectories.
+
+        Results are memoized per `(dynamics, kind, parameters, initial state)`, so
+        re-running an identical call returns immediately. `dynamics` is keyed by
+        identity: if it reads state that changes between calls (e.g. a closure over
+        mutable parameters), call `clear_cache()` after changing that state. Calls
+        with an unhashable `dynamics` or `jacobian` are not memoized.
+        """
+        if self._lyapunov_solver is None:
+            raise ImportError("Lyapunov spectra require the compiled dynamixplore._core extension.")
+        if kind is None and dynamics is None:
+            raise ValueError("Either a 'dynamics' function or a built-in system 'kind' is required.")
+
+        initial_state = self._traj_soa[:, -1].copy()
+        # Holding `dynamics` itself in the key (rather than its id) keeps it alive, so
+        # the key cannot be reused by a different function after garbage collection.
+        key = (
+            dynamics if kind is None else None, jacobian if kind is None else None, kind,
+            t_transient, t_total, t_reorth, h_init, abstol, reltol,
+            initial_state.tobytes()
         )
+        try:
+            cached = self._lyap_cache.get(key)
+        except TypeError:
+            # Unhashable `dynamics` or `jacobian` (e.g. `__eq__` without `__hash__`).
+            key = cached = None
+        if cached is None:
+            if kind is not None:
+                cached = self._lyapunov_solver.compute_spectrum_builtin(
+                    kind, initial_state, t_transient, t_total,
+                    t_reorth, h_init, abstol, reltol
+                )
+            else:
+                cached = self._lyapunov_solver.compute_spectrum(
+                    dynamics, initial_state, t_transient, t_total,
+                    t_reorth, h_init, abstol, reltol, jacobian=jacobian
+                )
+            if key is not None:
+                self._lyap_cache[key] = cached
+
+        # Hand out copies so callers cannot mutate the cached arrays.
+        spectrum, history = cached
+        return spectrum.copy(), history.copy()
+
+    def clear_cache(self) -> None:
+        """Discards all memoized Lyapunov spectra."""
+        self._lyap_cache.clear()
 
     def permutation_entropy(self, dim: int = 0, m: int = 3, tau: int = 1) -> float:
-        time_series = np.ascontiguousarray(self.trajectory[:, dim])
-        return self._entropy_solver.compute_permutation(time_series, m, tau)
+        time_series = self._traj_soa[dim]
+        if self._entropy_solver is not None:
+            return self._entropy_solver.compute_permutation(time_series, m, tau)
+        if _perm_entropy_nb is not None:
+            _check_perm_args(m, tau)
+            return _perm_entropy_nb(time_series, m, tau)
+        return _perm_entropy_numpy(time_series, m, tau)
+
+    def permutation_entropy_grid(self, dim: int = 0, ms: Sequence[int] = (3, 4, 5), taus: Sequence[int] = (1,)) -> np.ndarray:
+        """
+        Permutation entropy of dimension `dim` for every `(m, tau)` pair, as an array of
+        shape `(len(ms), len(taus))`. With the compiled core the whole sweep is a single
+        call, so the series is handed over once instead of once per pair.
+        """
+        time_series = self._traj_soa[dim]
+        ms, taus = [int(m) for m in ms], [int(tau) for tau in taus]
+        if self._entropy_solver is not None:
+            return self._entropy_solver.compute_permutation_grid(time_series, ms, taus)
+        grid = np.empty((len(ms), len(taus)))
+        for i, m in enumerate(ms):
+            for j, tau in enumerate(taus):
+                grid[i, j] = self.permutation_entropy(dim, m, tau)
+        return grid
 
     def invariant_measure(
         self,
         epsilon: float,
-        dims: Tuple[int, int] = (0, 1)
+        dims: Tuple[int, int] = (0, 1),
+        sparse: bool = False
     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Approximates the invariant measure projected onto two dimensions by box counting.
+
+        Returns `(histogram, x_bins, y_bins)`. With `sparse=True` the histogram is a
+        `scipy.sparse.coo_matrix` holding only the occupied boxes, which is much smaller
+        than the dense grid when `epsilon` is fine relative to the attractor.
+        """
         if len(dims) != 2:
             raise ValueError("Invariant measure projection only supports 2D.")
 
-        projected_traj = np.ascontiguousarray(self.trajectory[:, list(dims)])
-        hist_dict = self._stats_solver.compute_invariant_measure(projected_traj, epsilon)
+        if self._stats_solver is None:
+            raise ImportError("The invariant measure requires the compiled dynamixplore._core extension.")
 
-        if not hist_dict:
-            return np.array([[]]), np.array([]), np.array([])
-
-        coords = np.array(list(hist_dict.keys()))
-        counts = np.array(list(hist_dict.values()))
-
-        min_coords = coords.min(axis=0)
-        max_coords = coords.max(axis=0)
-
-        grid_shape = (max_coords - min_coords) + 1
-        hist = np.zeros(grid_shape, dtype=np.uint64)
-
-        grid_indices = coords - min_coords
-        hist[grid_indices[:, 0], grid_indices[:, 1]] = counts
+        x_idx, y_idx, counts = self._stats_solver.compute_invariant_measure(
+            self._traj_soa[dims[0]], self._traj_soa[dims[1]], epsilon
+        )
 
-        x_bins = np.arange(min_coords[0], max_coords[0] + 2) * epsilon
-        y_bins = np.arange(min_coords[1], max_coords[1] + 2) * epsilon
+        return _boxes_to_grid(x_idx, y_idx, counts, epsilon, sparse)
 
-        return hist, x_bins, y_bins
+    def to_dataframe(self, column_names: Optional[List[str]] = None) -> "pd.DataFrame":
+        import pandas as pd
 
-    def to_dataframe(self, column_names: Optional[List[str]] = None) -> pd.DataFrame:
         if column_names is None:
             column_names = [f'x{i}' for i in range(self.n_dims)]
 
         if len(column_names) != self.n_dims:
             raise ValueError(f"Expected {self.n_dims} column names, but got {len(column_names)}.")
 
-        df = pd.DataFrame(self.trajectory, columns=column_names)
-        if self.t is not None:
-            df.insert(0, 'time', self.t)
-        elif self.dt is not None:
-            time_axis = np.arange(0, self.n_points * self.dt, self.dt)
-            df.insert(0, 'time', time_axis[:self.n_points])
+        # Build the frame in one pass from a dict of 1-D columns (time first) rather than
+        # inserting the time column afterwards, which forces pandas to rebuild its blocks.
+        if self._time_axis is None:
+            # One allocation with exactly n_points entries and an exact endpoint; cached
+            # so repeated calls (e.g. trying different column names) reuse it.
+            self._time_axis = np.linspace(0.0, (self.n_points - 1) * self.dt, self.n_points)
+        data = {'time': self._time_axis}
+        data.update((name, self._traj_soa[i]) for i, name in enumerate(column_names))
 
-        return df
+        # Copied (not `copy=False`): the frame must not share writable memory with
+        # `_traj_soa` or the cached time axis, or editing it would change later results.
+        return pd.DataFrame(data)
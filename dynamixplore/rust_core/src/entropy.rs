@@ -1,7 +1,8 @@
 // This module is dedicated to computing information-theoretic properties of time series data.
 
-use numpy::PyReadonlyArray1;
+use numpy::{PyArray, PyArray2, PyArrayMethods, PyReadonlyArray1};
 use pyo3::prelude::*;
+use rayon::prelude::*;
 use std::collections::HashMap;
 
 /// # `calculate_phi` (Internal Helper)
@@ -51,6 +52,121 @@ fn calculate_phi(data: &[f64], m: usize, r: f64) -> f64 {
     log_counts_sum / (num_vectors as f64)
 }
 
+/// Largest `m` whose `m!` ordinal patterns are counted in a dense table; beyond it the
+/// table would outgrow the cache (9! entries is already 2.9 MB) and a `HashMap` is used.
+const MAX_DENSE_M: usize = 8;
+
+/// Largest supported `m`: the Lehmer code of a pattern must fit in a `u64` (20! < 2^64).
+const MAX_M: usize = 20;
+
+/// # `lehmer_code` (Internal Helper)
+///
+/// Maps the ordinal pattern of the window `data[start], data[start + tau], ...` to its
+/// Lehmer code in `0..m!` without allocating. Position `j` contributes the number of
+/// later samples strictly smaller than it, so ties are ordered by position exactly like
+/// a stable sort. The comparison is summed as an integer, which compiles to branchless
+/// code; with `m` known at compile time (see `count_fixed`) the loops fully unroll.
+#[inline(always)]
+fn lehmer_code(data: &[f64], start: usize, m: usize, tau: usize) -> u64 {
+    let mut code = 0u64;
+    for j in 0..m {
+        let x_j = data[start + j * tau];
+        let mut smaller = 0u64;
+        for k in (j + 1)..m {
+            smaller += (data[start + k * tau] < x_j) as u64;
+        }
+        // Horner evaluation in the factorial number system.
+        code = code * (m - j) as u64 + smaller;
+    }
+    code
+}
+
+/// Counts the patterns of every window into `counts` for a compile-time `M`.
+fn count_fixed<const M: usize>(data: &[f64], tau: usize, num_windows: usize, counts: &mut [u64]) {
+    for i in 0..num_windows {
+        counts[lehmer_code(data, i, M, tau) as usize] += 1;
+    }
+}
+
+/// # `permutation_entropy` (Internal Helper)
+///
+/// Normalized permutation entropy of `data` for embedding dimension `m` and delay `tau`.
+/// Touches no Python objects, so it can run with the GIL released.
+fn permutation_entropy(data: &[f64], m: usize, tau: usize) -> f64 {
+    let n = data.len();
+    let required_len = (m - 1) * tau + 1;
+    if n < required_len {
+        return 0.0; // Not enough data
+    }
+    let num_windows = n - required_len + 1;
+
+    // --- 1. Count Ordinal Patterns by Lehmer Code ---
+    let n_patterns: u64 = (1..=m as u64).product();
+    let pattern_counts: Vec<u64> = if m <= MAX_DENSE_M {
+        let mut counts = vec![0u64; n_patterns as usize];
+        match m {
+            2 => count_fixed::<2>(data, tau, num_windows, &mut counts),
+            3 => count_fixed::<3>(data, tau, num_windows, &mut counts),
+            4 => count_fixed::<4>(data, tau, num_windows, &mut counts),
+            5 => count_fixed::<5>(data, tau, num_windows, &mut counts),
+            6 => count_fixed::<6>(data, tau, num_windows, &mut counts),
+            7 => count_fixed::<7>(data, tau, num_windows, &mut counts),
+            8 => count_fixed::<8>(data, tau, num_windows, &mut counts),
+            _ => {
+                for i in 0..num_windows {
+                    counts[lehmer_code(data, i, m, tau) as usize] += 1;
+                }
+            }
+        }
+        counts
+    } else {
+        let mut counts: HashMap<u64, u64> = HashMap::new();
+        for i in 0..num_windows {
+            *counts.entry(lehmer_code(data, i, m, tau)).or_insert(0) += 1;
+        }
+        counts.into_values().collect()
+    };
+
+    // --- 2. Calculate Shannon Entropy from Frequencies ---
+    let total_patterns = num_windows as f64;
+    let mut entropy = 0.0;
+    for &count in pattern_counts.iter() {
+        let probability = (count as f64) / total_patterns;
+        if probability > 0.0 {
+            entropy -= probability * probability.log2();
+        }
+    }
+
+    // --- 3. Normalize the Entropy ---
+    let max_entropy = (n_patterns as f64).log2();
+    if max_entropy > 0.0 {
+        entropy / max_entropy
+    } else {
+        0.0
+    }
+}
+
+/// Validates the permutation-entropy parameters shared by the single and grid entry points.
+fn check_permutation_args(m: usize, tau: usize) -> PyResult<()> {
+    if m < 2 {
+        return Err(pyo3::exceptions::PyValueError::new_err(
+            "Embedding dimension 'm' must be at least 2.",
+        ));
+    }
+    if m > MAX_M {
+        return Err(pyo3::exceptions::PyValueError::new_err(format!(
+            "Embedding dimension 'm' must be at most {}.",
+            MAX_M
+        )));
+    }
+    if tau < 1 {
+        return Err(pyo3::exceptions::PyValueError::new_err(
+            "Time delay 'tau' must be at least 1.",
+        ));
+    }
+    Ok(())
+}
+
 /// # Entropy Calculator
 ///
 /// This class provides methods for computing various information-theoretic properties
@@ -118,67 +234,45 @@ impl Entropy {
     #[pyo3(signature = (time_series, m, tau))]
     fn compute_permutation(
         &self,
-        _py: Python,
+        py: Python,
         time_series: PyReadonlyArray1<f64>,
         m: usize,
         tau: usize,
     ) -> PyResult<f64> {
-        if m < 2 {
-            return Err(pyo3::exceptions::PyValueError::new_err(
-                "Embedding dimension 'm' must be at least 2.",
-            ));
-        }
-        if tau < 1 {
-            return Err(pyo3::exceptions::PyValueError::new_err(
-                "Time delay 'tau' must be at least 1.",
-            ));
-        }
+        check_permutation_args(m, tau)?;
 
         let data = time_series.as_slice()?;
-        let n = data.len();
-        let required_len = (m - 1) * tau + 1;
-        if n < required_len {
-            return Ok(0.0); // Not enough data
-        }
-
-        // --- 1. Iterate Through Time Series and Create Ordinal Patterns ---
-        let mut pattern_counts: HashMap<Vec<usize>, usize> = HashMap::new();
-        let num_windows = n - required_len + 1;
-
-        for i in 0..num_windows {
-            let window: Vec<f64> = (0..m).map(|j| data[i + j * tau]).collect();
-            let mut indexed_window: Vec<(usize, f64)> = window
-                .iter()
-                .enumerate()
-                .map(|(idx, &val)| (idx, val))
-                .collect();
-            // Sort by value to find the ordinal pattern
-            indexed_window.sort_by(|a, b| a.1.partial_cmp(&b.1).unwrap());
-            let pattern: Vec<usize> = indexed_window.iter().map(|(idx, _)| *idx).collect();
-            *pattern_counts.entry(pattern).or_insert(0) += 1;
-        }
-
-        if pattern_counts.is_empty() {
-            return Ok(0.0);
-        }
+        // Pure Rust from here on, so other Python threads may run meanwhile.
+        Ok(py.allow_threads(|| permutation_entropy(data, m, tau)))
+    }
 
-        // --- 2. Calculate Shannon Entropy from Frequencies ---
-        let total_patterns = num_windows as f64;
-        let mut entropy = 0.0;
-        for count in pattern_counts.values() {
-            let probability = (*count as f64) / total_patterns;
-            if probability > 0.0 {
-                entropy -= probability * probability.log2();
+    /// # Permutation Entropy Grid
+    ///
+    /// Permutation entropy of one series for every pair of `ms` x `taus`, returned as a
+    /// `(len(ms), len(taus))` array. The series is borrowed and the GIL released once
+    /// for the whole sweep, and the cells are computed in parallel with `rayon`.
+    #[pyo3(signature = (time_series, ms, taus))]
+    fn compute_permutation_grid<'py>(
+        &self,
+        py: Python<'py>,
+        time_series: PyReadonlyArray1<f64>,
+        ms: Vec<usize>,
+        taus: Vec<usize>,
+    ) -> PyResult<Bound<'py, PyArray2<f64>>> {
+        for &m in ms.iter() {
+            for &tau in taus.iter() {
+                check_permutation_args(m, tau)?;
             }
         }
 
-        // --- 3. Normalize the Entropy ---
-        let m_factorial = (1..=m).map(|i| i as f64).product::<f64>();
-        let max_entropy = m_factorial.log2();
-        if max_entropy > 0.0 {
-            Ok(entropy / max_entropy)
-        } else {
-            Ok(0.0)
-        }
+        let data = time_series.as_slice()?;
+        let n_taus = taus.len();
+        let values: Vec<f64> = py.allow_threads(|| {
+            (0..ms.len() * n_taus)
+                .into_par_iter()
+                .map(|cell| permutation_entropy(data, ms[cell / n_taus], taus[cell % n_taus]))
+                .collect()
+        });
+        PyArray::from_vec_bound(py, values).reshape((ms.len(), n_taus))
     }
 }
@@ -1,10 +1,12 @@
 // This module houses the numerical ODE solvers, refactored into a class-based, generic architecture.
 
+use crate::stats::BoxHistogram;
 use nalgebra::{DMatrix, DVector};
-use numpy::{ndarray::Dim, PyArray, PyArrayMethods, PyReadonlyArray1, ToPyArray};
+use numpy::{PyArray, PyArray1, PyArrayMethods, PyReadonlyArray1, PyReadonlyArray2, ToPyArray};
 use pyo3::exceptions::{PyNotImplementedError, PyTypeError, PyValueError};
 use pyo3::prelude::*;
 use pyo3::types::PyTuple;
+use rayon::prelude::*;
 //use pyo3::Bound;
 
 // --- 1. Core Traits for Generic Solver Design ---
@@ -62,44 +64,133 @@ impl<'py> Approach<'py> for Explicit<'py> {
         S: Stepper<'py, Self>,
     {
         let initial_y = DVector::from_column_slice(self.initial_state.as_slice()?);
+        let state_dim = initial_y.len();
         let mut current_t = self.t_start;
         let mut current_y = initial_y;
 
+        // Rows are appended straight into the buffer that becomes the NumPy array, so
+        // the result needs no per-row vectors and no flattening copy on the way out.
         let num_steps = ((self.t_end - self.t_start) / self.h).ceil() as usize;
-        let mut trajectory: Vec<DVector<f64>> = Vec::with_capacity(num_steps + 1);
-        trajectory.push(current_y.clone());
+        let mut flat_trajectory: Vec<f64> = Vec::with_capacity((num_steps + 1) * state_dim);
+        flat_trajectory.extend_from_slice(current_y.as_slice());
 
         let mut call_dynamics = |t_eval: f64, y_eval: &DVector<f64>| -> PyResult<DVector<f64>> {
             let y_py = y_eval.as_slice().to_pyarray_bound(py);
             let args = PyTuple::new_bound(py, &[t_eval.into_py(py), y_py.into_py(py)]);
             let result = self.dynamics.call_bound(py, args, None)?;
-            let bound_result = result.bind(py);
-            let py_array: &PyArray<f64, Dim<[usize; 1]>> = bound_result.extract()?;
-            let readonly_array = py_array.readonly();
-            Ok(DVector::from_column_slice(readonly_array.as_slice()?))
+            rhs_to_dvector(result.bind(py))
         };
 
         for _ in 0..num_steps {
-            let y_next = stepper.step(current_t, &current_y, self.h, &mut call_dynamics)?;
-            current_y = y_next;
+            current_y = stepper.step(current_t, &current_y, self.h, &mut call_dynamics)?;
             current_t += self.h;
-            trajectory.push(current_y.clone());
+            flat_trajectory.extend_from_slice(current_y.as_slice());
+        }
+
+        trajectory_to_py(py, flat_trajectory, num_steps + 1, state_dim)
+    }
+}
+
+/// Converts the value returned by a Python right-hand side into a state vector.
+///
+/// A contiguous float64 array is copied straight out of its buffer. Anything else
+/// (a tuple, a list, an array of another dtype) goes through the sequence protocol,
+/// so a callback can return `(dx, dy, dz)` without building an array per call.
+pub fn rhs_to_dvector(result: &Bound<'_, PyAny>) -> PyResult<DVector<f64>> {
+    if let Ok(array) = result.downcast::<PyArray1<f64>>() {
+        let readonly = array.readonly();
+        if let Ok(slice) = readonly.as_slice() {
+            return Ok(DVector::from_column_slice(slice));
+        }
+    }
+    let values: Vec<f64> = result.extract()?;
+    Ok(DVector::from_vec(values))
+}
+
+/// State types the adaptive controller can drive: heap-allocated `DVector`s for
+/// arbitrary dimensions and stack arrays for the fixed-size native fast path.
+pub trait StateNorm {
+    /// Euclidean norm, summed in index order.
+    fn norm(&self) -> f64;
+}
+
+impl StateNorm for DVector<f64> {
+    #[inline]
+    fn norm(&self) -> f64 {
+        DVector::norm(self)
+    }
+}
+
+impl<const N: usize> StateNorm for [f64; N] {
+    #[inline]
+    fn norm(&self) -> f64 {
+        self.iter().fold(0.0, |acc, &x| acc + x * x).sqrt()
+    }
+}
+
+/// The adaptive step-size controller shared by every RK45 driver.
+///
+/// `step` performs a single embedded step and returns `(y_next, error_estimate)`.
+/// `on_accept` is called with `(t, y)` after every accepted step. The final state
+/// is returned. Nothing here touches the Python interpreter, so callers whose
+/// right-hand side is pure Rust can run the whole loop with the GIL released.
+pub fn adaptive_drive<Y, St, G>(
+    mut step: St,
+    mut on_accept: G,
+    initial_y: Y,
+    t_start: f64,
+    t_end: f64,
+    initial_h: f64,
+    abstol: f64,
+    reltol: f64,
+) -> PyResult<Y>
+where
+    Y: StateNorm,
+    St: FnMut(f64, &Y, f64) -> PyResult<(Y, Y)>,
+    G: FnMut(f64, &Y),
+{
+    const SAFETY: f64 = 0.9;
+    const MIN_FACTOR: f64 = 0.2;
+    const MAX_FACTOR: f64 = 10.0;
+
+    let mut current_y = initial_y;
+    let mut current_t = t_start;
+    let mut current_h = initial_h;
+
+    while current_t < t_end {
+        if current_t + current_h > t_end {
+            current_h = t_end - current_t;
+        }
+        if current_h <= 0.0 {
+            break;
         }
 
-        let num_points = trajectory.len();
-        let state_dim = if num_points > 0 {
-            trajectory[0].len()
+        let (y_next, error_vec) = step(current_t, &current_y, current_h)?;
+        let error_norm = error_vec.norm();
+        let y_norm = current_y.norm().max(y_next.norm());
+        let tolerance = abstol + reltol * y_norm;
+        let error = if tolerance > 0.0 {
+            error_norm / tolerance
         } else {
-            0
+            0.0
         };
-        let flat_trajectory: Vec<f64> = trajectory
-            .into_iter()
-            .flat_map(|v| v.iter().cloned().collect::<Vec<f64>>())
-            .collect();
-        let result_array =
-            PyArray::from_vec_bound(py, flat_trajectory).reshape((num_points, state_dim))?;
-        Ok(result_array.to_object(py))
+
+        if error <= 1.0 {
+            current_t += current_h;
+            current_y = y_next;
+            on_accept(current_t, &current_y);
+        }
+
+        let factor = if error > 0.0 {
+            let factor = SAFETY * (1.0 / error).powf(0.2);
+            factor.clamp(MIN_FACTOR, MAX_FACTOR)
+        } else {
+            MAX_FACTOR
+        };
+        current_h *= factor;
     }
+
+    Ok(current_y)
 }
 
 impl<'py> Approach<'py> for Adaptive<'py> {
@@ -108,82 +199,35 @@ impl<'py> Approach<'py> for Adaptive<'py> {
     where
         S: Stepper<'py, Self>,
         {
-        let mut current_y = DVector::from_column_slice(self.initial_state.as_slice()?);
-        let mut current_t = self.t_start;
-        let mut current_h = self.initial_h;
+        let initial_y = DVector::from_column_slice(self.initial_state.as_slice()?);
+        let state_dim = initial_y.len();
 
-        let mut times: Vec<f64> = Vec::new();
-        let mut trajectory: Vec<DVector<f64>> = Vec::new();
-        times.push(current_t);
-        trajectory.push(current_y.clone());
+        // Accepted states go straight into the buffer that becomes the NumPy array.
+        let mut times: Vec<f64> = vec![self.t_start];
+        let mut flat_trajectory: Vec<f64> = initial_y.as_slice().to_vec();
 
         let mut call_dynamics = |t_eval: f64, y_eval: &DVector<f64>| -> PyResult<DVector<f64>> {
             let y_py = y_eval.as_slice().to_pyarray_bound(py);
             let args = PyTuple::new_bound(py, &[t_eval.into_py(py), y_py.into_py(py)]);
             let result = self.dynamics.call_bound(py, args, None)?;
-            let bound_result = result.bind(py);
-            let py_array: &PyArray<f64, Dim<[usize; 1]>> = bound_result.extract()?;
-            let readonly_array = py_array.readonly();
-            Ok(DVector::from_column_slice(readonly_array.as_slice()?))
+            rhs_to_dvector(result.bind(py))
         };
 
-        const SAFETY: f64 = 0.9;
-        const MIN_FACTOR: f64 = 0.2;
-        const MAX_FACTOR: f64 = 10.0;
-
-        while current_t < self.t_end {
-            if current_t + current_h > self.t_end {
-                current_h = self.t_end - current_t;
-            }
-            if current_h <= 0.0 {
-                break;
-            }
-
-            let (y_next, error_vec) =
-                stepper.step(current_t, &current_y, current_h, &mut call_dynamics)?;
-            let error_norm = error_vec.norm();
-            let y_norm = current_y.norm().max(y_next.norm());
-            let tolerance = self.abstol + self.reltol * y_norm;
-            let error = if tolerance > 0.0 {
-                error_norm / tolerance
-            } else {
-                0.0
-            };
-
-            if error <= 1.0 {
-                current_t += current_h;
-                current_y = y_next;
-                times.push(current_t);
-                trajectory.push(current_y.clone());
-            }
-
-            let factor = if error > 0.0 {
-                let factor = SAFETY * (1.0 / error).powf(0.2);
-                factor.clamp(MIN_FACTOR, MAX_FACTOR)
-            } else {
-                MAX_FACTOR
-            };
-            current_h *= factor;
-        }
-        
-        let num_points = trajectory.len();
-        let state_dim = if num_points > 0 {
-            trajectory[0].len()
-        } else {
-            0
-        };
-        let flat_trajectory: Vec<f64> = trajectory
-        .into_iter()
-        .flat_map(|v| v.iter().cloned().collect::<Vec<f64>>())
-        .collect();
-        let traj_array =
-        PyArray::from_vec_bound(py, flat_trajectory).reshape((num_points, state_dim))?;
-        let time_array = PyArray::from_vec_bound(py, times);
-        let result_tuple =
-        PyTuple::new_bound(py, &[traj_array.to_object(py), time_array.to_object(py)]);
+        adaptive_drive(
+            |t, y, h| stepper.step(t, y, h, &mut call_dynamics),
+            |t, y| {
+                times.push(t);
+                flat_trajectory.extend_from_slice(y.as_slice());
+            },
+            initial_y,
+            self.t_start,
+            self.t_end,
+            self.initial_h,
+            self.abstol,
+            self.reltol,
+        )?;
 
-        let a = Ok(result_tuple.to_object(py));
-        a
+        adaptive_result_to_py(py, times, flat_trajectory, state_dim)
     }
 }
 
@@ -194,43 +238,30 @@ impl<'py> Approach<'py> for Implicit<'py> {
         S: Stepper<'py, Self>,
     {
         let initial_y = DVector::from_column_slice(self.initial_state.as_slice()?);
+        let state_dim = initial_y.len();
         let mut current_t = self.t_start;
         let mut current_y = initial_y;
 
+        // Rows are appended straight into the buffer that becomes the NumPy array, so
+        // the result needs no per-row vectors and no flattening copy on the way out.
         let num_steps = ((self.t_end - self.t_start) / self.h).ceil() as usize;
-        let mut trajectory: Vec<DVector<f64>> = Vec::with_capacity(num_steps + 1);
-        trajectory.push(current_y.clone());
+        let mut flat_trajectory: Vec<f64> = Vec::with_capacity((num_steps + 1) * state_dim);
+        flat_trajectory.extend_from_slice(current_y.as_slice());
 
         let mut call_dynamics = |t_eval: f64, y_eval: &DVector<f64>| -> PyResult<DVector<f64>> {
             let y_py = y_eval.as_slice().to_pyarray_bound(py);
             let args = PyTuple::new_bound(py, &[t_eval.into_py(py), y_py.into_py(py)]);
             let result = self.dynamics.call_bound(py, args, None)?;
-            let bound_result = result.bind(py);
-            let py_array: &PyArray<f64, Dim<[usize; 1]>> = bound_result.extract()?;
-            let readonly_array = py_array.readonly();
-            Ok(DVector::from_column_slice(readonly_array.as_slice()?))
+            rhs_to_dvector(result.bind(py))
         };
 
         for _ in 0..num_steps {
-            let y_next = stepper.step(current_t, &current_y, self.h, &mut call_dynamics)?;
-            current_y = y_next;
+            current_y = stepper.step(current_t, &current_y, self.h, &mut call_dynamics)?;
             current_t += self.h;
-            trajectory.push(current_y.clone());
+            flat_trajectory.extend_from_slice(current_y.as_slice());
         }
 
-        let num_points = trajectory.len();
-        let state_dim = if num_points > 0 {
-            trajectory[0].len()
-        } else {
-            0
-        };
-        let flat_trajectory: Vec<f64> = trajectory
-            .into_iter()
-            .flat_map(|v| v.iter().cloned().collect::<Vec<f64>>())
-            .collect();
-        let result_array =
-            PyArray::from_vec_bound(py, flat_trajectory).reshape((num_points, state_dim))?;
-        Ok(result_array.to_object(py))
+        trajectory_to_py(py, flat_trajectory, num_steps + 1, state_dim)
     }
 }
 
@@ -250,77 +281,152 @@ impl<'py> Stepper<'py, Adaptive<'py>> for Rk45 {
     where
         F: FnMut(f64, &DVector<f64>) -> PyResult<DVector<f64>>,
     {
-        // Dormand-Prince Coefficients
-        const C2: f64 = 1.0 / 5.0;
-        const C3: f64 = 3.0 / 10.0;
-        const C4: f64 = 4.0 / 5.0;
-        const C5: f64 = 8.0 / 9.0;
-        const A21: f64 = 1.0 / 5.0;
-        const A31: f64 = 3.0 / 40.0;
-        const A32: f64 = 9.0 / 40.0;
-        const A41: f64 = 44.0 / 45.0;
-        const A42: f64 = -56.0 / 15.0;
-        const A43: f64 = 32.0 / 9.0;
-        const A51: f64 = 19372.0 / 6561.0;
-        const A52: f64 = -25360.0 / 2187.0;
-        const A53: f64 = 64448.0 / 6561.0;
-        const A54: f64 = -212.0 / 729.0;
-        const A61: f64 = 9017.0 / 3168.0;
-        const A62: f64 = -355.0 / 33.0;
-        const A63: f64 = 46732.0 / 5247.0;
-        const A64: f64 = 49.0 / 176.0;
-        const A65: f64 = -5103.0 / 18656.0;
-        const A71: f64 = 35.0 / 384.0;
-        const A72: f64 = 0.0;
-        const A73: f64 = 500.0 / 1113.0;
-        const A74: f64 = 125.0 / 192.0;
-        const A75: f64 = -2187.0 / 6784.0;
-        const A76: f64 = 11.0 / 84.0;
-        const B1: f64 = 35.0 / 384.0;
-        const B2: f64 = 0.0;
-        const B3: f64 = 500.0 / 1113.0;
-        const B4: f64 = 125.0 / 192.0;
-        const B5: f64 = -2187.0 / 6784.0;
-        const B6: f64 = 11.0 / 84.0;
-        const B7: f64 = 0.0;
-        const B_STAR_1: f64 = 5179.0 / 57600.0;
-        const B_STAR_2: f64 = 0.0;
-        const B_STAR_3: f64 = 7571.0 / 16695.0;
-        const B_STAR_4: f64 = 393.0 / 640.0;
-        const B_STAR_5: f64 = -92097.0 / 339200.0;
-        const B_STAR_6: f64 = 187.0 / 2100.0;
-        const B_STAR_7: f64 = 1.0 / 40.0;
-        let k1 = h * f(t, y)?;
-        let k2 = h * f(t + C2 * h, &(y + A21 * &k1))?;
-        let k3 = h * f(t + C3 * h, &(y + A31 * &k1 + A32 * &k2))?;
-        let k4 = h * f(t + C4 * h, &(y + A41 * &k1 + A42 * &k2 + A43 * &k3))?;
-        let k5 = h * f(
-            t + C5 * h,
-            &(y + A51 * &k1 + A52 * &k2 + A53 * &k3 + A54 * &k4),
-        )?;
-        let k6 = h * f(
-            t + h,
-            &(y + A61 * &k1 + A62 * &k2 + A63 * &k3 + A64 * &k4 + A65 * &k5),
-        )?;
-        let k7 = h * f(
-            t + h,
-            &(y + A71 * &k1 + A72 * &k2 + A73 * &k3 + A74 * &k4 + A75 * &k5 + A76 * &k6),
-        )?;
-        let y_next_5 =
-            y + B1 * &k1 + B2 * &k2 + B3 * &k3 + B4 * &k4 + B5 * &k5 + B6 * &k6 + B7 * &k7;
-        let y_next_4 = y
-            + B_STAR_1 * &k1
-            + B_STAR_2 * &k2
-            + B_STAR_3 * &k3
-            + B_STAR_4 * &k4
-            + B_STAR_5 * &k5
-            + B_STAR_6 * &k6
-            + B_STAR_7 * &k7;
-        let error_vec = &y_next_5 - &y_next_4;
-        Ok((y_next_5, error_vec))
+        dormand_prince_step(t, y, h, f)
     }
 }
 
+// Dormand-Prince 5(4) coefficients, shared by the dynamic and fixed-size steppers.
+const C2: f64 = 1.0 / 5.0;
+const C3: f64 = 3.0 / 10.0;
+const C4: f64 = 4.0 / 5.0;
+const C5: f64 = 8.0 / 9.0;
+const A21: f64 = 1.0 / 5.0;
+const A31: f64 = 3.0 / 40.0;
+const A32: f64 = 9.0 / 40.0;
+const A41: f64 = 44.0 / 45.0;
+const A42: f64 = -56.0 / 15.0;
+const A43: f64 = 32.0 / 9.0;
+const A51: f64 = 19372.0 / 6561.0;
+const A52: f64 = -25360.0 / 2187.0;
+const A53: f64 = 64448.0 / 6561.0;
+const A54: f64 = -212.0 / 729.0;
+const A61: f64 = 9017.0 / 3168.0;
+const A62: f64 = -355.0 / 33.0;
+const A63: f64 = 46732.0 / 5247.0;
+const A64: f64 = 49.0 / 176.0;
+const A65: f64 = -5103.0 / 18656.0;
+const A71: f64 = 35.0 / 384.0;
+const A72: f64 = 0.0;
+const A73: f64 = 500.0 / 1113.0;
+const A74: f64 = 125.0 / 192.0;
+const A75: f64 = -2187.0 / 6784.0;
+const A76: f64 = 11.0 / 84.0;
+const B1: f64 = 35.0 / 384.0;
+const B2: f64 = 0.0;
+const B3: f64 = 500.0 / 1113.0;
+const B4: f64 = 125.0 / 192.0;
+const B5: f64 = -2187.0 / 6784.0;
+const B6: f64 = 11.0 / 84.0;
+const B7: f64 = 0.0;
+const B_STAR_1: f64 = 5179.0 / 57600.0;
+const B_STAR_2: f64 = 0.0;
+const B_STAR_3: f64 = 7571.0 / 16695.0;
+const B_STAR_4: f64 = 393.0 / 640.0;
+const B_STAR_5: f64 = -92097.0 / 339200.0;
+const B_STAR_6: f64 = 187.0 / 2100.0;
+const B_STAR_7: f64 = 1.0 / 40.0;
+
+/// A single Dormand-Prince 5(4) step, returning `(y_next, error_estimate)`.
+/// Shared by the `Rk45` stepper and the pure-Rust drivers built on `adaptive_drive`.
+pub fn dormand_prince_step<F>(
+    t: f64,
+    y: &DVector<f64>,
+    h: f64,
+    f: &mut F,
+) -> PyResult<(DVector<f64>, DVector<f64>)>
+where
+    F: FnMut(f64, &DVector<f64>) -> PyResult<DVector<f64>>,
+{
+    let k1 = h * f(t, y)?;
+    let k2 = h * f(t + C2 * h, &(y + A21 * &k1))?;
+    let k3 = h * f(t + C3 * h, &(y + A31 * &k1 + A32 * &k2))?;
+    let k4 = h * f(t + C4 * h, &(y + A41 * &k1 + A42 * &k2 + A43 * &k3))?;
+    let k5 = h * f(
+        t + C5 * h,
+        &(y + A51 * &k1 + A52 * &k2 + A53 * &k3 + A54 * &k4),
+    )?;
+    let k6 = h * f(
+        t + h,
+        &(y + A61 * &k1 + A62 * &k2 + A63 * &k3 + A64 * &k4 + A65 * &k5),
+    )?;
+    let k7 = h * f(
+        t + h,
+        &(y + A71 * &k1 + A72 * &k2 + A73 * &k3 + A74 * &k4 + A75 * &k5 + A76 * &k6),
+    )?;
+    let y_next_5 =
+        y + B1 * &k1 + B2 * &k2 + B3 * &k3 + B4 * &k4 + B5 * &k5 + B6 * &k6 + B7 * &k7;
+    let y_next_4 = y
+        + B_STAR_1 * &k1
+        + B_STAR_2 * &k2
+        + B_STAR_3 * &k3
+        + B_STAR_4 * &k4
+        + B_STAR_5 * &k5
+        + B_STAR_6 * &k6
+        + B_STAR_7 * &k7;
+    let error_vec = &y_next_5 - &y_next_4;
+    Ok((y_next_5, error_vec))
+}
+
+/// `dormand_prince_step` specialized for an `N`-dimensional state and a native
+/// right-hand side. Every stage lives in a stack array whose length is known at
+/// compile time, so the stage combinations unroll and vectorize and no step allocates.
+/// The arithmetic is term-for-term that of the dynamic version.
+fn dormand_prince_step_fixed<const N: usize>(
+    t: f64,
+    y: &[f64; N],
+    h: f64,
+    rhs: NativeRhs,
+) -> ([f64; N], [f64; N]) {
+    use std::array::from_fn;
+
+    let stage = |t_eval: f64, y_eval: &[f64; N]| -> [f64; N] {
+        let mut out = [0.0; N];
+        unsafe { rhs(t_eval, y_eval.as_ptr(), out.as_mut_ptr(), N as isize) };
+        from_fn(|i| h * out[i])
+    };
+    let k1 = stage(t, y);
+    let k2 = stage(t + C2 * h, &from_fn(|i| y[i] + A21 * k1[i]));
+    let k3 = stage(t + C3 * h, &from_fn(|i| y[i] + A31 * k1[i] + A32 * k2[i]));
+    let k4 = stage(
+        t + C4 * h,
+        &from_fn(|i| y[i] + A41 * k1[i] + A42 * k2[i] + A43 * k3[i]),
+    );
+    let k5 = stage(
+        t + C5 * h,
+        &from_fn(|i| y[i] + A51 * k1[i] + A52 * k2[i] + A53 * k3[i] + A54 * k4[i]),
+    );
+    let k6 = stage(
+        t + h,
+        &from_fn(|i| y[i] + A61 * k1[i] + A62 * k2[i] + A63 * k3[i] + A64 * k4[i] + A65 * k5[i]),
+    );
+    let k7 = stage(
+        t + h,
+        &from_fn(|i| {
+            y[i] + A71 * k1[i] + A72 * k2[i] + A73 * k3[i] + A74 * k4[i] + A75 * k5[i] + A76 * k6[i]
+        }),
+    );
+    let y_next_5: [f64; N] = from_fn(|i| {
+        y[i] + B1 * k1[i]
+            + B2 * k2[i]
+            + B3 * k3[i]
+            + B4 * k4[i]
+            + B5 * k5[i]
+            + B6 * k6[i]
+            + B7 * k7[i]
+    });
+    let y_next_4: [f64; N] = from_fn(|i| {
+        y[i] + B_STAR_1 * k1[i]
+            + B_STAR_2 * k2[i]
+            + B_STAR_3 * k3[i]
+            + B_STAR_4 * k4[i]
+            + B_STAR_5 * k5[i]
+            + B_STAR_6 * k6[i]
+            + B_STAR_7 * k7[i]
+    });
+    let error_vec = from_fn(|i| y_next_5[i] - y_next_4[i]);
+    (y_next_5, error_vec)
+}
+
 #[pyclass]
 #[derive(Copy, Clone)]
 pub struct Rk4;
@@ -467,7 +573,305 @@ where
     Err(PyValueError::new_err("Newton's method did not converge."))
 }
 
-// --- 5. PyO3 Class Definitions for Python API ---
+// --- 5. Native Right-Hand Sides ---
+
+/// A compiled right-hand side `rhs(t, y, out, n)` that writes `dy/dt` for the `n`-element
+/// state `y` into `out`, e.g. the address of a `numba.cfunc` with signature
+/// `void(float64, CPointer(float64), CPointer(float64), intp)`.
+type NativeRhs = unsafe extern "C" fn(f64, *const f64, *mut f64, isize);
+
+/// Wraps a native function address as a closure usable by the steppers.
+///
+/// # Safety
+/// `address` must point to a function with the `NativeRhs` signature that stays alive
+/// (the Python side keeps the compiled object referenced) and only reads/writes `n`
+/// elements through its pointers.
+unsafe fn native_closure(
+    address: usize,
+) -> impl FnMut(f64, &DVector<f64>) -> PyResult<DVector<f64>> + Send {
+    let rhs: NativeRhs = std::mem::transmute::<usize, NativeRhs>(address);
+    move |t: f64, y: &DVector<f64>| {
+        let mut out = DVector::<f64>::zeros(y.len());
+        unsafe { rhs(t, y.as_ptr(), out.as_mut_ptr(), y.len() as isize) };
+        Ok(out)
+    }
+}
+
+/// Fixed-step integration of one initial condition with a native right-hand side,
+/// returning the flattened `(num_steps + 1, n)` trajectory. Pure Rust: callers run it
+/// with the GIL released.
+fn integrate_explicit_native<'py, S>(
+    stepper: &S,
+    address: usize,
+    initial_y: DVector<f64>,
+    t_start: f64,
+    num_steps: usize,
+    h: f64,
+) -> PyResult<Vec<f64>>
+where
+    S: Stepper<'py, Explicit<'py>>,
+{
+    let mut f = unsafe { native_closure(address) };
+    let mut flat = Vec::with_capacity((num_steps + 1) * initial_y.len());
+    flat.extend_from_slice(initial_y.as_slice());
+    let mut current_t = t_start;
+    let mut current_y = initial_y;
+    for _ in 0..num_steps {
+        current_y = stepper.step(current_t, &current_y, h, &mut f)?;
+        current_t += h;
+        flat.extend_from_slice(current_y.as_slice());
+    }
+    Ok(flat)
+}
+
+/// Adaptive RK45 integration of one initial condition with a native right-hand side,
+/// returning `(times, flattened trajectory)`. Pure Rust, like `integrate_explicit_native`.
+///
+/// The common small dimensions dispatch to `integrate_adaptive_fixed`, monomorphized
+/// for that `N`; any other size uses the `DVector` stepper.
+fn integrate_adaptive_native(
+    address: usize,
+    initial_y: DVector<f64>,
+    t_start: f64,
+    t_end: f64,
+    initial_h: f64,
+    abstol: f64,
+    reltol: f64,
+) -> PyResult<(Vec<f64>, Vec<f64>)> {
+    let args = (address, t_start, t_end, initial_h, abstol, reltol);
+    match initial_y.len() {
+        2 => return integrate_adaptive_fixed::<2>(initial_y.as_slice(), args),
+        3 => return integrate_adaptive_fixed::<3>(initial_y.as_slice(), args),
+        4 => return integrate_adaptive_fixed::<4>(initial_y.as_slice(), args),
+        6 => return integrate_adaptive_fixed::<6>(initial_y.as_slice(), args),
+        _ => {}
+    }
+
+    let mut f = unsafe { native_closure(address) };
+    let mut times = vec![t_start];
+    let mut flat = initial_y.as_slice().to_vec();
+    adaptive_drive(
+        |t, y, h| dormand_prince_step(t, y, h, &mut f),
+        |t, y| {
+            times.push(t);
+            flat.extend_from_slice(y.as_slice());
+        },
+        initial_y,
+        t_start,
+        t_end,
+        initial_h,
+        abstol,
+        reltol,
+    )?;
+    Ok((times, flat))
+}
+
+/// `integrate_adaptive_native` for an `N`-dimensional state, stepping stack arrays with
+/// `dormand_prince_step_fixed`. `args` is `(address, t_start, t_end, initial_h, abstol,
+/// reltol)`.
+fn integrate_adaptive_fixed<const N: usize>(
+    initial_y: &[f64],
+    args: (usize, f64, f64, f64, f64, f64),
+) -> PyResult<(Vec<f64>, Vec<f64>)> {
+    let (address, t_start, t_end, initial_h, abstol, reltol) = args;
+    let rhs: NativeRhs = unsafe { std::mem::transmute::<usize, NativeRhs>(address) };
+    let initial_y: [f64; N] = initial_y
+        .try_into()
+        .map_err(|_| PyValueError::new_err("State length does not match the specialization."))?;
+
+    let mut times = vec![t_start];
+    let mut flat = initial_y.to_vec();
+    adaptive_drive(
+        |t, y: &[f64; N], h| Ok(dormand_prince_step_fixed(t, y, h, rhs)),
+        |t, y: &[f64; N]| {
+            times.push(t);
+            flat.extend_from_slice(y);
+        },
+        initial_y,
+        t_start,
+        t_end,
+        initial_h,
+        abstol,
+        reltol,
+    )?;
+    Ok((times, flat))
+}
+
+fn trajectory_to_py(
+    py: Python,
+    flat: Vec<f64>,
+    num_points: usize,
+    state_dim: usize,
+) -> PyResult<PyObject> {
+    let array = PyArray::from_vec_bound(py, flat).reshape((num_points, state_dim))?;
+    Ok(array.to_object(py))
+}
+
+fn adaptive_result_to_py(
+    py: Python,
+    times: Vec<f64>,
+    flat: Vec<f64>,
+    state_dim: usize,
+) -> PyResult<PyObject> {
+    let traj_array = trajectory_to_py(py, flat, times.len(), state_dim)?;
+    let time_array = PyArray::from_vec_bound(py, times);
+    let result_tuple = PyTuple::new_bound(py, &[traj_array, time_array.to_object(py)]);
+    Ok(result_tuple.to_object(py))
+}
+
+/// Copies every row of `initial_states` into an owned vector so the rows can be handed
+/// to worker threads.
+fn owned_rows(initial_states: &PyReadonlyArray2<f64>) -> Vec<DVector<f64>> {
+    initial_states
+        .as_array()
+        .rows()
+        .into_iter()
+        .map(|row| DVector::from_vec(row.to_vec()))
+        .collect()
+}
+
+/// Fixed-step integration with a native right-hand side. No Python object is touched
+/// inside the loop, so it runs with the GIL released.
+fn solve_explicit_native<'py, S>(
+    py: Python<'py>,
+    stepper: S,
+    address: usize,
+    initial_state: PyReadonlyArray1<'py, f64>,
+    t_start: f64,
+    t_end: f64,
+    h: f64,
+) -> PyResult<PyObject>
+where
+    S: Stepper<'py, Explicit<'py>> + Send,
+{
+    let initial_y = DVector::from_column_slice(initial_state.as_slice()?);
+    let state_dim = initial_y.len();
+    let num_steps = ((t_end - t_start) / h).ceil() as usize;
+
+    let flat_trajectory = py.allow_threads(move || {
+        integrate_explicit_native(&stepper, address, initial_y, t_start, num_steps, h)
+    })?;
+    trajectory_to_py(py, flat_trajectory, num_steps + 1, state_dim)
+}
+
+/// Adaptive RK45 integration with a native right-hand side, run with the GIL released.
+/// Returns `(trajectory, times)` like the Python-callback path.
+fn solve_adaptive_native(
+    py: Python,
+    address: usize,
+    initial_state: PyReadonlyArray1<f64>,
+    t_start: f64,
+    t_end: f64,
+    initial_h: f64,
+    abstol: f64,
+    reltol: f64,
+) -> PyResult<PyObject> {
+    let initial_y = DVector::from_column_slice(initial_state.as_slice()?);
+    let state_dim = initial_y.len();
+
+    let (times, flat_trajectory) = py.allow_threads(move || {
+        integrate_adaptive_native(
+            address, initial_y, t_start, t_end, initial_h, abstol, reltol,
+        )
+    })?;
+    adaptive_result_to_py(py, times, flat_trajectory, state_dim)
+}
+
+/// Batched counterpart of `solve_explicit_native`: the rows of `initial_states` are
+/// independent systems, so they are integrated concurrently on the Rayon pool with the
+/// GIL released, each worker calling the compiled right-hand side on its own state.
+fn solve_explicit_native_batch<'py, S>(
+    py: Python<'py>,
+    stepper: S,
+    address: usize,
+    initial_states: &PyReadonlyArray2<'py, f64>,
+    t_start: f64,
+    t_end: f64,
+    h: f64,
+) -> PyResult<Vec<PyObject>>
+where
+    S: Stepper<'py, Explicit<'py>> + Sync,
+{
+    let rows = owned_rows(initial_states);
+    let state_dim = initial_states.as_array().ncols();
+    let num_steps = ((t_end - t_start) / h).ceil() as usize;
+
+    let flats = py.allow_threads(|| {
+        rows.into_par_iter()
+            .map(|initial_y| {
+                integrate_explicit_native(&stepper, address, initial_y, t_start, num_steps, h)
+            })
+            .collect::<PyResult<Vec<Vec<f64>>>>()
+    })?;
+    flats
+        .into_iter()
+        .map(|flat| trajectory_to_py(py, flat, num_steps + 1, state_dim))
+        .collect()
+}
+
+/// Batched counterpart of `solve_adaptive_native`. Every row keeps its own step-size
+/// controller, so a stiff initial condition only slows down the worker that owns it.
+fn solve_adaptive_native_batch(
+    py: Python,
+    address: usize,
+    initial_states: &PyReadonlyArray2<f64>,
+    t_start: f64,
+    t_end: f64,
+    initial_h: f64,
+    abstol: f64,
+    reltol: f64,
+) -> PyResult<Vec<PyObject>> {
+    let rows = owned_rows(initial_states);
+    let state_dim = initial_states.as_array().ncols();
+
+    let results = py.allow_threads(|| {
+        rows.into_par_iter()
+            .map(|initial_y| {
+                integrate_adaptive_native(
+                    address, initial_y, t_start, t_end, initial_h, abstol, reltol,
+                )
+            })
+            .collect::<PyResult<Vec<(Vec<f64>, Vec<f64>)>>>()
+    })?;
+    results
+        .into_iter()
+        .map(|(times, flat)| adaptive_result_to_py(py, times, flat, state_dim))
+        .collect()
+}
+
+/// Adaptive RK45 integration that box-counts the projection onto `dims` as each step is
+/// accepted instead of recording the trajectory, so memory stays proportional to the
+/// number of occupied boxes. The initial state is counted too, as `box_count` would.
+fn histogram_adaptive<F>(
+    f: &mut F,
+    initial_y: DVector<f64>,
+    t_start: f64,
+    t_end: f64,
+    initial_h: f64,
+    abstol: f64,
+    reltol: f64,
+    epsilon: f64,
+    dims: (usize, usize),
+) -> PyResult<BoxHistogram>
+where
+    F: FnMut(f64, &DVector<f64>) -> PyResult<DVector<f64>>,
+{
+    let mut histogram = BoxHistogram::new(epsilon);
+    histogram.add(initial_y[dims.0], initial_y[dims.1]);
+    adaptive_drive(
+        |t, y, h| dormand_prince_step(t, y, h, &mut *f),
+        |_, y| histogram.add(y[dims.0], y[dims.1]),
+        initial_y,
+        t_start,
+        t_end,
+        initial_h,
+        abstol,
+        reltol,
+    )?;
+    Ok(histogram)
+}
+
+// --- 6. PyO3 Class Definitions for Python API ---
 
 #[pyclass(name = "Explicit")]
 #[derive(Clone)]
@@ -482,6 +886,9 @@ pub struct ExplicitParams {
     t_end: f64,
     #[pyo3(get, set)]
     h: f64,
+    /// Address of a native right-hand side (see `from_cfunc`); `None` for `dynamics`.
+    #[pyo3(get)]
+    rhs_address: Option<usize>,
 }
 
 #[pymethods]
@@ -494,6 +901,29 @@ impl ExplicitParams {
             t_start,
             t_end,
             h,
+            rhs_address: None,
+        }
+    }
+
+    /// Builds the mode around a compiled right-hand side instead of a Python callable.
+    /// `address` must be a `void(float64, float64*, float64*, intp)` function, such as
+    /// `numba.cfunc(...).address`, kept alive by the caller for the whole solve.
+    #[staticmethod]
+    fn from_cfunc(
+        py: Python,
+        address: usize,
+        initial_state: PyObject,
+        t_start: f64,
+        t_end: f64,
+        h: f64,
+    ) -> Self {
+        Self {
+            dynamics: py.None(),
+            initial_state,
+            t_start,
+            t_end,
+            h,
+            rhs_address: Some(address),
         }
     }
 }
@@ -544,6 +974,9 @@ pub struct AdaptiveParams {
     abstol: f64,
     #[pyo3(get, set)]
     reltol: f64,
+    /// Address of a native right-hand side (see `from_cfunc`); `None` for `dynamics`.
+    #[pyo3(get)]
+    rhs_address: Option<usize>,
 }
 
 #[pymethods]
@@ -567,10 +1000,60 @@ impl AdaptiveParams {
             h,
             abstol,
             reltol,
+            rhs_address: None,
+        }
+    }
+
+    /// Builds the mode around a compiled right-hand side instead of a Python callable.
+    /// `address` must be a `void(float64, float64*, float64*, intp)` function, such as
+    /// `numba.cfunc(...).address`, kept alive by the caller for the whole solve.
+    #[staticmethod]
+    #[pyo3(signature = (address, initial_state, t_start, t_end, h, abstol=1e-6, reltol=1e-3))]
+    fn from_cfunc(
+        py: Python,
+        address: usize,
+        initial_state: PyObject,
+        t_start: f64,
+        t_end: f64,
+        h: f64,
+        abstol: f64,
+        reltol: f64,
+    ) -> Self {
+        Self {
+            dynamics: py.None(),
+            initial_state,
+            t_start,
+            t_end,
+            h,
+            abstol,
+            reltol,
+            rhs_address: Some(address),
         }
     }
 }
 
+/// Runs `solve_one` once per row of `initial_states`, collecting the results in order.
+///
+/// Shared by the `solve_batch` methods for Python-callable dynamics: the rows are
+/// integrated sequentially with the GIL held; the saving comes from crossing the
+/// Python/Rust boundary and unpacking the mode object once for the whole batch.
+/// Compiled right-hand sides take the parallel `solve_*_native_batch` paths instead.
+fn solve_rows<'py, F>(
+    py: Python<'py>,
+    initial_states: &PyReadonlyArray2<'py, f64>,
+    mut solve_one: F,
+) -> PyResult<Vec<PyObject>>
+where
+    F: FnMut(PyReadonlyArray1<'py, f64>) -> PyResult<PyObject>,
+{
+    initial_states
+        .as_array()
+        .rows()
+        .into_iter()
+        .map(|row| solve_one(row.to_pyarray_bound(py).readonly()))
+        .collect()
+}
+
 #[pymethods]
 impl Rk45 {
     #[new]
@@ -581,6 +1064,18 @@ impl Rk45 {
     fn solve<'py>(&self, py: Python<'py>, mode: PyObject) -> PyResult<PyObject> {
         if let Ok(params) = mode.extract::<AdaptiveParams>(py) {
             let initial_state = params.initial_state.extract::<PyReadonlyArray1<f64>>(py)?;
+            if let Some(address) = params.rhs_address {
+                return solve_adaptive_native(
+                    py,
+                    address,
+                    initial_state,
+                    params.t_start,
+                    params.t_end,
+                    params.h,
+                    params.abstol,
+                    params.reltol,
+                );
+            }
             Adaptive {
                 dynamics: params.dynamics,
                 initial_state,
@@ -597,6 +1092,120 @@ impl Rk45 {
             ))
         }
     }
+
+    /// Solves the same system from every row of `initial_states` in a single call,
+    /// returning one result per row as `solve` would. The `initial_state` stored on
+    /// `mode` is ignored.
+    fn solve_batch<'py>(
+        &self,
+        py: Python<'py>,
+        mode: PyObject,
+        initial_states: PyReadonlyArray2<'py, f64>,
+    ) -> PyResult<Vec<PyObject>> {
+        if let Ok(params) = mode.extract::<AdaptiveParams>(py) {
+            if let Some(address) = params.rhs_address {
+                return solve_adaptive_native_batch(
+                    py,
+                    address,
+                    &initial_states,
+                    params.t_start,
+                    params.t_end,
+                    params.h,
+                    params.abstol,
+                    params.reltol,
+                );
+            }
+            solve_rows(py, &initial_states, |initial_state| {
+                Adaptive {
+                    dynamics: params.dynamics.clone_ref(py),
+                    initial_state,
+                    t_start: params.t_start,
+                    t_end: params.t_end,
+                    initial_h: params.h,
+                    abstol: params.abstol,
+                    reltol: params.reltol,
+                }
+                .integration_loop(py, *self)
+            })
+        } else {
+            Err(PyTypeError::new_err(
+                "RK45 solver requires an 'Adaptive' mode.",
+            ))
+        }
+    }
+
+    /// Integrates like `solve`, but box-counts the projection onto `dims` with boxes of
+    /// side `epsilon` as the solver goes, never materializing the trajectory. Returns the
+    /// occupied boxes as `(x_indices, y_indices, counts)`, the same format as
+    /// `Stats.compute_invariant_measure`.
+    #[pyo3(signature = (mode, epsilon, dims=(0, 1)))]
+    fn solve_and_histogram<'py>(
+        &self,
+        py: Python<'py>,
+        mode: PyObject,
+        epsilon: f64,
+        dims: (usize, usize),
+    ) -> PyResult<(
+        Bound<'py, PyArray1<i32>>,
+        Bound<'py, PyArray1<i32>>,
+        Bound<'py, PyArray1<u64>>,
+    )> {
+        let params = mode
+            .extract::<AdaptiveParams>(py)
+            .map_err(|_| PyTypeError::new_err("RK45 solver requires an 'Adaptive' mode."))?;
+        if epsilon <= 0.0 {
+            return Err(PyValueError::new_err(
+                "Box size 'epsilon' must be positive.",
+            ));
+        }
+        let initial_state = params.initial_state.extract::<PyReadonlyArray1<f64>>(py)?;
+        let initial_y = DVector::from_column_slice(initial_state.as_slice()?);
+        if dims.0 >= initial_y.len() || dims.1 >= initial_y.len() {
+            return Err(PyValueError::new_err(format!(
+                "Projection dimensions {:?} are out of range for a {}-dimensional state.",
+                dims,
+                initial_y.len()
+            )));
+        }
+
+        let (t_start, t_end, initial_h) = (params.t_start, params.t_end, params.h);
+        let (abstol, reltol) = (params.abstol, params.reltol);
+        let histogram = if let Some(address) = params.rhs_address {
+            py.allow_threads(move || {
+                let mut f = unsafe { native_closure(address) };
+                histogram_adaptive(
+                    &mut f, initial_y, t_start, t_end, initial_h, abstol, reltol, epsilon, dims,
+                )
+            })?
+        } else {
+            let dynamics = &params.dynamics;
+            let mut call_dynamics =
+                |t_eval: f64, y_eval: &DVector<f64>| -> PyResult<DVector<f64>> {
+                    let y_py = y_eval.as_slice().to_pyarray_bound(py);
+                    let args = PyTuple::new_bound(py, &[t_eval.into_py(py), y_py.into_py(py)]);
+                    let result = dynamics.call_bound(py, args, None)?;
+                    rhs_to_dvector(result.bind(py))
+                };
+            histogram_adaptive(
+                &mut call_dynamics,
+                initial_y,
+                t_start,
+                t_end,
+                initial_h,
+                abstol,
+                reltol,
+                epsilon,
+                dims,
+            )?
+        };
+
+        let (x_indices, y_indices, counts) = histogram.into_triplets()?;
+        Ok((
+            PyArray1::from_vec_bound(py, x_indices),
+            PyArray1::from_vec_bound(py, y_indices),
+            PyArray1::from_vec_bound(py, counts),
+        ))
+    }
 }
 
 #[pymethods]
@@ -609,6 +1218,17 @@ impl Rk4 {
     fn solve<'py>(&self, py: Python<'py>, mode: PyObject) -> PyResult<PyObject> {
         if let Ok(params) = mode.extract::<ExplicitParams>(py) {
             let initial_state = params.initial_state.extract::<PyReadonlyArray1<f64>>(py)?;
+            if let Some(address) = params.rhs_address {
+                return solve_explicit_native(
+                    py,
+                    *self,
+                    address,
+                    initial_state,
+                    params.t_start,
+                    params.t_end,
+                    params.h,
+                );
+            }
             Explicit {
                 dynamics: params.dynamics,
                 initial_state,
@@ -633,6 +1253,55 @@ impl Rk4 {
             ))
         }
     }
+
+    /// Solves the same system from every row of `initial_states` in a single call,
+    /// returning one result per row as `solve` would. The `initial_state` stored on
+    /// `mode` is ignored.
+    fn solve_batch<'py>(
+        &self,
+        py: Python<'py>,
+        mode: PyObject,
+        initial_states: PyReadonlyArray2<'py, f64>,
+    ) -> PyResult<Vec<PyObject>> {
+        if let Ok(params) = mode.extract::<ExplicitParams>(py) {
+            if let Some(address) = params.rhs_address {
+                return solve_explicit_native_batch(
+                    py,
+                    *self,
+                    address,
+                    &initial_states,
+                    params.t_start,
+                    params.t_end,
+                    params.h,
+                );
+            }
+            solve_rows(py, &initial_states, |initial_state| {
+                Explicit {
+                    dynamics: params.dynamics.clone_ref(py),
+                    initial_state,
+                    t_start: params.t_start,
+                    t_end: params.t_end,
+                    h: params.h,
+                }
+                .integration_loop(py, *self)
+            })
+        } else if let Ok(params) = mode.extract::<ImplicitParams>(py) {
+            solve_rows(py, &initial_states, |initial_state| {
+                Implicit {
+                    dynamics: params.dynamics.clone_ref(py),
+                    initial_state,
+                    t_start: params.t_start,
+                    t_end: params.t_end,
+                    h: params.h,
+                }
+                .integration_loop(py, *self)
+            })
+        } else {
+            Err(PyTypeError::new_err(
+                "RK4 solver requires an 'Explicit' or 'Implicit' mode.",
+            ))
+        }
+    }
 }
 
 #[pymethods]
@@ -645,6 +1314,17 @@ impl Euler {
     fn solve<'py>(&self, py: Python<'py>, mode: PyObject) -> PyResult<PyObject> {
         if let Ok(params) = mode.extract::<ExplicitParams>(py) {
             let initial_state = params.initial_state.extract::<PyReadonlyArray1<f64>>(py)?;
+            if let Some(address) = params.rhs_address {
+                return solve_explicit_native(
+                    py,
+                    *self,
+                    address,
+                    initial_state,
+                    params.t_start,
+                    params.t_end,
+                    params.h,
+                );
+            }
             Explicit {
                 dynamics: params.dynamics,
                 initial_state,
@@ -669,4 +1349,53 @@ impl Euler {
             ))
         }
     }
+
+    /// Solves the same system from every row of `initial_states` in a single call,
+    /// returning one result per row as `solve` would. The `initial_state` stored on
+    /// `mode` is ignored.
+    fn solve_batch<'py>(
+        &self,
+        py: Python<'py>,
+        mode: PyObject,
+        initial_states: PyReadonlyArray2<'py, f64>,
+    ) -> PyResult<Vec<PyObject>> {
+        if let Ok(params) = mode.extract::<ExplicitParams>(py) {
+            if let Some(address) = params.rhs_address {
+                return solve_explicit_native_batch(
+                    py,
+                    *self,
+                    address,
+                    &initial_states,
+                    params.t_start,
+                    params.t_end,
+                    params.h,
+                );
+            }
+            solve_rows(py, &initial_states, |initial_state| {
+                Explicit {
+                    dynamics: params.dynamics.clone_ref(py),
+                    initial_state,
+                    t_start: params.t_start,
+                    t_end: params.t_end,
+                    h: params.h,
+                }
+                .integration_loop(py, *self)
+            })
+        } else if let Ok(params) = mode.extract::<ImplicitParams>(py) {
+            solve_rows(py, &initial_states, |initial_state| {
+                Implicit {
+                    dynamics: params.dynamics.clone_ref(py),
+                    initial_state,
+                    t_start: params.t_start,
+                    t_end: params.t_end,
+                    h: params.h,
+                }
+                .integration_loop(py, *self)
+            })
+        } else {
+            Err(PyTypeError::new_err(
+                "Euler solver requires an 'Explicit' or 'Implicit' mode.",
+            ))
+        }
+    }
 }
@@ -7,6 +7,7 @@ pub mod entropy;
 pub mod integrators;
 pub mod lyapunov;
 pub mod stats;
+pub mod systems;
 
 #[cfg(test)]
 mod unit_test;
@@ -1,9 +1,185 @@
-use crate::integrators::{Adaptive, Approach, Rk45}; // Import the Approach trait
+use crate::integrators::{adaptive_drive, dormand_prince_step, rhs_to_dvector};
+use crate::systems::BuiltinSystem;
 use nalgebra::{DMatrix, DVector};
-use numpy::{ndarray::Dim, PyArray, PyArrayMethods, PyReadonlyArray1, ToPyArray};
+use numpy::{PyArray, PyArrayMethods, PyReadonlyArray1, PyReadonlyArray2, ToPyArray};
+use pyo3::exceptions::PyValueError;
 use pyo3::prelude::*;
 use pyo3::types::PyTuple;
 
+/// Orthonormalizes the columns of `w` in place by modified Gram-Schmidt, leaving the `Q`
+/// factor of its QR decomposition in `w`, and adds `ln R_jj` to `log_sums`.
+///
+/// Only the diagonal of `R` is needed for the spectrum, so nothing else is stored and no
+/// matrix is allocated. Gram-Schmidt already yields a positive diagonal, so unlike a
+/// Householder QR no sign correction of `Q` is required.
+fn reorthonormalize(w: &mut DMatrix<f64>, log_sums: &mut DVector<f64>) {
+    let (rows, cols) = w.shape();
+    for j in 0..cols {
+        for i in 0..j {
+            let r_ij = w.column(i).dot(&w.column(j));
+            for k in 0..rows {
+                let q_ki = w[(k, i)];
+                w[(k, j)] -= r_ij * q_ki;
+            }
+        }
+        let r_jj = w.column(j).norm();
+        log_sums[j] += r_jj.ln();
+        w.column_mut(j).unscale_mut(r_jj);
+    }
+}
+
+/// # Benettin / QR Algorithm (Internal Helper)
+///
+/// `advance(y0, duration)` must integrate the system from `y0` for `duration` time
+/// units and return the final state. Returns the final spectrum together with the
+/// running estimate after every re-orthogonalization, flattened row by row.
+fn benettin_spectrum<A>(
+    mut advance: A,
+    initial_y: DVector<f64>,
+    t_transient: f64,
+    t_total: f64,
+    t_reorth: f64,
+    eps: f64,
+) -> PyResult<(DVector<f64>, Vec<f64>)>
+where
+    A: FnMut(DVector<f64>, f64) -> PyResult<DVector<f64>>,
+{
+    let state_dim = initial_y.len();
+    let mut main_y = advance(initial_y, t_transient)?;
+
+    let mut perturbation_w = DMatrix::<f64>::identity(state_dim, state_dim);
+    let mut lyapunov_sums = DVector::<f64>::zeros(state_dim);
+    let mut current_t = 0.0;
+    let num_steps = (t_total / t_reorth).ceil() as usize;
+    let mut spectrum_history: Vec<f64> = Vec::with_capacity(num_steps * state_dim);
+
+    // Scratch matrix for the evolved perturbations, reused (by swapping with
+    // `perturbation_w`) across every re-orthogonalization instead of reallocated.
+    let mut evolved_w = DMatrix::<f64>::zeros(state_dim, state_dim);
+
+    for _ in 0..num_steps {
+        // Evolve the reference trajectory and each perturbed copy over one interval.
+        let next_y = advance(main_y.clone(), t_reorth)?;
+
+        for j in 0..state_dim {
+            let perturbed_y = advance(&main_y + eps * perturbation_w.column(j), t_reorth)?;
+            let mut column = evolved_w.column_mut(j);
+            column.copy_from(&perturbed_y);
+            column -= &next_y;
+            column.unscale_mut(eps);
+        }
+        main_y = next_y;
+
+        reorthonormalize(&mut evolved_w, &mut lyapunov_sums);
+        std::mem::swap(&mut perturbation_w, &mut evolved_w);
+        current_t += t_reorth;
+        if current_t > 0.0 {
+            spectrum_history.extend((&lyapunov_sums / current_t).iter());
+        }
+    }
+
+    Ok((lyapunov_sums / t_total, spectrum_history))
+}
+
+/// # Variational QR Algorithm (Internal Helper)
+///
+/// Same estimator as `benettin_spectrum`, but the tangent vectors are evolved with the
+/// variational equation `dΦ/dt = J(t, y) Φ` instead of finite differences. The reference
+/// state and `Φ` are integrated together as one augmented vector `[y; vec(Φ)]`, so each
+/// RHS evaluation costs one `rhs` and one `jac` call rather than `dim + 1` trajectories.
+fn variational_spectrum<F, J>(
+    mut rhs: F,
+    mut jac: J,
+    initial_y: DVector<f64>,
+    t_transient: f64,
+    t_total: f64,
+    t_reorth: f64,
+    h_init: f64,
+    abstol: f64,
+    reltol: f64,
+) -> PyResult<(DVector<f64>, Vec<f64>)>
+where
+    F: FnMut(f64, &DVector<f64>) -> PyResult<DVector<f64>>,
+    J: FnMut(f64, &DVector<f64>) -> PyResult<DMatrix<f64>>,
+{
+    let state_dim = initial_y.len();
+    let mut main_y = adaptive_drive(
+        |t, y, h| dormand_prince_step(t, y, h, &mut rhs),
+        |_, _| {},
+        initial_y,
+        0.0,
+        t_transient,
+        h_init,
+        abstol,
+        reltol,
+    )?;
+
+    let mut augmented_rhs = |t: f64, z: &DVector<f64>| -> PyResult<DVector<f64>> {
+        let y = z.rows(0, state_dim).into_owned();
+        let phi = DMatrix::from_column_slice(state_dim, state_dim, &z.as_slice()[state_dim..]);
+        let jacobian = jac(t, &y)?;
+        let mut dz = DVector::<f64>::zeros(z.len());
+        dz.rows_mut(0, state_dim).copy_from(&rhs(t, &y)?);
+        dz.rows_mut(state_dim, state_dim * state_dim)
+            .copy_from_slice((jacobian * phi).as_slice());
+        Ok(dz)
+    };
+
+    let mut perturbation_w = DMatrix::<f64>::identity(state_dim, state_dim);
+    let mut lyapunov_sums = DVector::<f64>::zeros(state_dim);
+    let mut current_t = 0.0;
+    let num_steps = (t_total / t_reorth).ceil() as usize;
+    let mut spectrum_history: Vec<f64> = Vec::with_capacity(num_steps * state_dim);
+
+    let mut z = DVector::<f64>::zeros(state_dim * (state_dim + 1));
+
+    for _ in 0..num_steps {
+        z.rows_mut(0, state_dim).copy_from(&main_y);
+        z.rows_mut(state_dim, state_dim * state_dim)
+            .copy_from_slice(perturbation_w.as_slice());
+
+        z = adaptive_drive(
+            |t, y, h| dormand_prince_step(t, y, h, &mut augmented_rhs),
+            |_, _| {},
+            z,
+            0.0,
+            t_reorth,
+            h_init,
+            abstol,
+            reltol,
+        )?;
+        main_y.copy_from(&z.rows(0, state_dim));
+        perturbation_w.copy_from_slice(&z.as_slice()[state_dim..]);
+
+        reorthonormalize(&mut perturbation_w, &mut lyapunov_sums);
+        current_t += t_reorth;
+        if current_t > 0.0 {
+            spectrum_history.extend((&lyapunov_sums / current_t).iter());
+        }
+    }
+
+    Ok((lyapunov_sums / t_total, spectrum_history))
+}
+
+/// Packs a spectrum and its flattened history into the `(spectrum, history)` tuple
+/// returned to Python.
+fn spectrum_to_py(py: Python, spectrum: DVector<f64>, history: Vec<f64>) -> PyResult<PyObject> {
+    let state_dim = spectrum.len();
+    let num_rows = if state_dim > 0 {
+        history.len() / state_dim
+    } else {
+        0
+    };
+    let final_spectrum_py = spectrum.as_slice().to_pyarray_bound(py);
+    let history_array = PyArray::from_vec_bound(py, history).reshape((num_rows, state_dim))?;
+
+    let result_tuple = PyTuple::new_bound(
+        py,
+        &[final_spectrum_py.to_object(py), history_array.to_object(py)],
+    );
+    Ok(result_tuple.to_object(py))
+}
+
 /// # Lyapunov Spectrum Calculator
 ///
 /// ## Purpose
@@ -25,11 +201,16 @@ impl Lyapunov {
         Lyapunov::new()
     }
 
+    /// Computes the spectrum of a Python-defined system.
+    ///
+    /// If `jacobian` is given it must be a callable `(t, y) -> J` returning the
+    /// `(dim, dim)` matrix `J[i, j] = ∂f_i/∂y_j`. The tangent space is then evolved with
+    /// the variational equation instead of `dim` finite-difference trajectories.
     #[pyo3(signature = (
         dynamics, initial_state,
         t_transient, t_total, t_reorth,
         h_init, abstol, reltol,
-        eps = 1e-8,
+        eps = 1e-8, jacobian = None,
     ))]
     fn compute_spectrum(
         &self,
@@ -43,112 +224,129 @@ impl Lyapunov {
         abstol: f64,
         reltol: f64,
         eps: f64,
+        jacobian: Option<PyObject>,
     ) -> PyResult<PyObject> {
-        let state_dim = initial_state.len()?;
-
-        let transient_result = Adaptive {
-            dynamics: dynamics.clone(),
-            initial_state: initial_state.clone(),
-            t_start: 0.0,
-            t_end: t_transient,
-            initial_h: h_init,
-            abstol,
-            reltol,
-        }
-        .integration_loop(py, Rk45)?;
-
-        let transient_traj_obj = transient_result.bind(py).get_item(0)?;
-        // FIX: Explicitly specify the dimension as 2D for the PyArray.
-        let transient_traj: &PyArray<f64, Dim<[usize; 2]>> = transient_traj_obj.extract()?;
-
-        let traj_view = unsafe { transient_traj.as_array() };
-        let last_row = traj_view.outer_iter().last().unwrap();
+        let initial_y = DVector::from_column_slice(initial_state.as_slice()?);
 
-        let mut main_y = DVector::from_row_slice(last_row.as_slice().unwrap());
+        let mut call_dynamics = |t_eval: f64, y_eval: &DVector<f64>| -> PyResult<DVector<f64>> {
+            let y_py = y_eval.as_slice().to_pyarray_bound(py);
+            let args = PyTuple::new_bound(py, &[t_eval.into_py(py), y_py.into_py(py)]);
+            let result = dynamics.call_bound(py, args, None)?;
+            rhs_to_dvector(result.bind(py))
+        };
 
-        let mut perturbation_w = DMatrix::<f64>::identity(state_dim, state_dim);
-        let mut lyapunov_sums = DVector::<f64>::zeros(state_dim);
-        let mut current_t = 0.0;
-        let num_steps = (t_total / t_reorth).ceil() as usize;
-        let mut spectrum_history: Vec<DVector<f64>> = Vec::with_capacity(num_steps);
+        if let Some(jacobian) = jacobian {
+            let state_dim = initial_y.len();
+            let call_jacobian = |t_eval: f64, y_eval: &DVector<f64>| -> PyResult<DMatrix<f64>> {
+                let y_py = y_eval.as_slice().to_pyarray_bound(py);
+                let args = PyTuple::new_bound(py, &[t_eval.into_py(py), y_py.into_py(py)]);
+                let result = jacobian.call_bound(py, args, None)?;
+                let jac_array: PyReadonlyArray2<f64> = result.bind(py).extract()?;
+                let jac_view = jac_array.as_array();
+                if jac_view.dim() != (state_dim, state_dim) {
+                    return Err(PyValueError::new_err(format!(
+                        "The jacobian must return a ({0}, {0}) array, but returned {1:?}.",
+                        state_dim,
+                        jac_view.shape()
+                    )));
+                }
+                Ok(DMatrix::from_fn(state_dim, state_dim, |i, j| {
+                    jac_view[[i, j]]
+                }))
+            };
 
-        for _ in 0..num_steps {
-            let mut initial_states: Vec<DVector<f64>> = Vec::with_capacity(state_dim + 1);
-            initial_states.push(main_y.clone());
-            for j in 0..state_dim {
-                initial_states.push(&main_y + eps * perturbation_w.column(j));
-            }
-
-            let final_states: Vec<DVector<f64>> = initial_states
-                // TODO: Fix this bug 
-                // .par_iter() 
-                .iter()
-                .map(|y0| {
-                    Python::with_gil(|py| {
-                        let y0_py = y0.as_slice().to_pyarray_bound(py);
-                        let result_tuple = Adaptive {
-                            dynamics: dynamics.clone(),
-                            initial_state: y0_py.readonly(),
-                            t_start: 0.0,
-                            t_end: t_reorth,
-                            initial_h: h_init,
-                            abstol,
-                            reltol,
-                        }
-                        .integration_loop(py, Rk45)
-                        .unwrap();
-
-                        // Get the trajectory for the current parallel task
-                        let traj_obj = result_tuple.bind(py).get_item(0).unwrap();
-                        let traj: &PyArray<f64, Dim<[usize; 2]>> = traj_obj.extract().unwrap();
-
-                        // Create a view from the correct `traj` variable
-                        let traj_view = unsafe { traj.as_array() };
-                        // Get the last state from that view
-                        let last_state = traj_view.outer_iter().last().unwrap();
-                        // Use the correct `last_state` variable to create the vector
-                        DVector::from_row_slice(last_state.as_slice().unwrap())
-                    })
-                })
-                .collect();
-
-            main_y = final_states[0].clone();
-
-            let mut evolved_w = DMatrix::<f64>::zeros(state_dim, state_dim);
-            for j in 0..state_dim {
-                let evolved_perturbation = (&final_states[j + 1] - &main_y) / eps;
-                evolved_w.set_column(j, &evolved_perturbation);
-            }
-
-            let qr = evolved_w.qr();
-            let q = qr.q();
-            let r = qr.r();
+            let (spectrum, history) = variational_spectrum(
+                call_dynamics,
+                call_jacobian,
+                initial_y,
+                t_transient,
+                t_total,
+                t_reorth,
+                h_init,
+                abstol,
+                reltol,
+            )?;
+            return spectrum_to_py(py, spectrum, history);
+        }
 
-            for j in 0..state_dim {
-                lyapunov_sums[j] += r[(j, j)].abs().ln();
-            }
+        let (spectrum, history) = benettin_spectrum(
+            |y0, duration| {
+                adaptive_drive(
+                    |t, y, h| dormand_prince_step(t, y, h, &mut call_dynamics),
+                    |_, _| {},
+                    y0,
+                    0.0,
+                    duration,
+                    h_init,
+                    abstol,
+                    reltol,
+                )
+            },
+            initial_y,
+            t_transient,
+            t_total,
+            t_reorth,
+            eps,
+        )?;
+        spectrum_to_py(py, spectrum, history)
+    }
 
-            perturbation_w = q;
-            current_t += t_reorth;
-            if current_t > 0.0 {
-                spectrum_history.push(&lyapunov_sums / current_t);
-            }
+    /// Computes the spectrum of a system whose right-hand side is compiled into the core
+    /// (see `systems::BuiltinSystem`). No Python callback is involved, so the whole
+    /// computation runs with the GIL released.
+    #[pyo3(signature = (
+        kind, initial_state,
+        t_transient, t_total, t_reorth,
+        h_init, abstol, reltol,
+        eps = 1e-8,
+    ))]
+    fn compute_spectrum_builtin(
+        &self,
+        py: Python,
+        kind: String,
+        initial_state: PyReadonlyArray1<f64>,
+        t_transient: f64,
+        t_total: f64,
+        t_reorth: f64,
+        h_init: f64,
+        abstol: f64,
+        reltol: f64,
+        eps: f64,
+    ) -> PyResult<PyObject> {
+        let system = BuiltinSystem::from_name(&kind)?;
+        let initial_y = DVector::from_column_slice(initial_state.as_slice()?);
+        if initial_y.len() != system.dim() {
+            return Err(PyValueError::new_err(format!(
+                "The '{}' system is {}-dimensional, but the initial state has {} components.",
+                kind,
+                system.dim(),
+                initial_y.len()
+            )));
         }
 
-        let final_spectrum = lyapunov_sums / t_total;
-        let final_spectrum_py = final_spectrum.as_slice().to_pyarray_bound(py);
-
-        let history_flat: Vec<f64> = spectrum_history
-            .into_iter()
-            .flat_map(|v| v.iter().cloned().collect::<Vec<_>>())
-            .collect();
-        let history_array =
-            PyArray::from_vec_bound(py, history_flat).reshape((num_steps, state_dim))?;
-
-        let result_tuple = PyTuple::new_bound(
-            py,
-            &[final_spectrum_py.to_object(py), history_array.to_object(py)],
-        );
-        Ok(result_tuple.to_object(py))
+        let (spectrum, history) = py.allow_threads(move || {
+            let mut rhs =
+                |t: f64, y: &DVector<f64>| -> PyResult<DVector<f64>> { Ok(system.rhs(t, y)) };
+            benettin_spectrum(
+                |y0, duration| {
+                    adaptive_drive(
+                        |t, y, h| dormand_prince_step(t, y, h, &mut rhs),
+                        |_, _| {},
+                        y0,
+                        0.0,
+                        duration,
+                        h_init,
+                        abstol,
+                        reltol,
+                    )
+                },
+                initial_y,
+                t_transient,
+                t_total,
+                t_reorth,
+                eps,
+            )
+        })?;
+        spectrum_to_py(py, spectrum, history)
     }
 }
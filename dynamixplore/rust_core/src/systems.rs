@@ -0,0 +1,66 @@
+// This module holds dynamical systems whose right-hand sides are compiled into the core.
+// They let analyses such as the Lyapunov spectrum run entirely in Rust, without calling
+// back into a Python `dynamics` function (and therefore without holding the GIL).
+
+use nalgebra::DVector;
+use pyo3::exceptions::PyValueError;
+use pyo3::prelude::*;
+
+/// # Built-in Systems
+///
+/// The classic systems used throughout the examples and benchmarks, with their
+/// standard parameter values. Selected from Python by name via the `kind` argument.
+#[derive(Copy, Clone, Debug)]
+pub enum BuiltinSystem {
+    /// Lorenz system with sigma = 10, rho = 28, beta = 8/3.
+    Lorenz,
+    /// Rössler system with a = 0.2, b = 0.2, c = 5.7.
+    Rossler,
+}
+
+impl BuiltinSystem {
+    /// Looks up a system by its (case-insensitive) name.
+    pub fn from_name(name: &str) -> PyResult<Self> {
+        match name.to_lowercase().as_str() {
+            "lorenz" => Ok(BuiltinSystem::Lorenz),
+            "rossler" | "rössler" => Ok(BuiltinSystem::Rossler),
+            _ => Err(PyValueError::new_err(format!(
+                "Unknown built-in system '{}'. Use one of ['lorenz', 'rossler'].",
+                name
+            ))),
+        }
+    }
+
+    /// The dimension of the system's state vector.
+    pub fn dim(&self) -> usize {
+        match self {
+            BuiltinSystem::Lorenz | BuiltinSystem::Rossler => 3,
+        }
+    }
+
+    /// Evaluates the right-hand side `dy/dt = f(t, y)`.
+    pub fn rhs(&self, _t: f64, y: &DVector<f64>) -> DVector<f64> {
+        match self {
+            BuiltinSystem::Lorenz => {
+                const SIGMA: f64 = 10.0;
+                const RHO: f64 = 28.0;
+                const BETA: f64 = 8.0 / 3.0;
+                DVector::from_column_slice(&[
+                    SIGMA * (y[1] - y[0]),
+                    y[0] * (RHO - y[2]) - y[1],
+                    y[0] * y[1] - BETA * y[2],
+                ])
+            }
+            BuiltinSystem::Rossler => {
+                const A: f64 = 0.2;
+                const B: f64 = 0.2;
+                const C: f64 = 5.7;
+                DVector::from_column_slice(&[
+                    -y[1] - y[2],
+                    y[0] + A * y[1],
+                    B + y[2] * (y[0] - C),
+                ])
+            }
+        }
+    }
+}
@@ -1,30 +1,236 @@
 from __future__ import annotations
-from typing import Callable, List, Tuple, Union
+import warnings
+from collections import OrderedDict
+from enum import IntEnum
+from types import FunctionType
+from typing import TYPE_CHECKING, Callable, List, Tuple, Union
 import numpy as np
 
 # This relative import is now safe because the circular dependency
 # on the Analysis class has been removed.
 from dynamixplore import _core as rust_core
 
+if TYPE_CHECKING:
+    from dynamixplore.analysis import Analysis
+
+
+class Solver(IntEnum):
+    """
+    Integration schemes accepted by `Simulation.run`. The value indexes `_SOLVER_TABLE`.
+    """
+    RK45 = 0
+    RK4 = 1
+    EULER = 2
+
+
+# Built once at import so `run` dispatches with a tuple index instead of a per-call dict.
+# The Rust solvers are stateless, so a single shared instance of each is enough.
+_SOLVER_NAMES = ('RK45', 'RK4', 'Euler')
+_SOLVER_TABLE = (rust_core.Rk45(), rust_core.Rk4(), rust_core.Euler()) if rust_core is not None else ()
+
+# Compiled RHS shims per dynamics function (None when compilation failed), shared by
+# every Simulation so sweeps over one system compile it only once. A shim keeps its
+# function alive (the compiled code refers back to it), so the cache is bounded and
+# drops the least recently used entry; sweeps that build a new function per run thus
+# hold at most `_NATIVE_RHS_CACHE_SIZE` of them. Hand-written cfuncs registered with
+# `register_rhs` do not refer back and are kept on the function itself instead.
+_NATIVE_RHS_CACHE: OrderedDict = OrderedDict()
+_NATIVE_RHS_CACHE_SIZE = 16
+_NATIVE_ATTR = '_dynamixplore_native'
+
+
+def _cache_native(dynamics_func: Callable, native) -> None:
+    try:
+        _NATIVE_RHS_CACHE[dynamics_func] = native
+    except TypeError:
+        return  # Not hashable; it is simply recompiled next time.
+    _NATIVE_RHS_CACHE.move_to_end(dynamics_func)
+    while len(_NATIVE_RHS_CACHE) > _NATIVE_RHS_CACHE_SIZE:
+        _NATIVE_RHS_CACHE.popitem(last=False)
+
+
+def _native_rhs(dynamics_func: Callable):
+    """
+    Compiles `dynamics_func` with Numba into a C-callable `rhs(t, y, out, n)` shim
+    whose `.address` the Rust core can call directly, without the interpreter.
+
+    Returns the `numba.cfunc` object, or None when Numba is not installed or the
+    function cannot be compiled in nopython mode (with a RuntimeWarning saying so).
+    """
+    registered = getattr(dynamics_func, _NATIVE_ATTR, None)
+    if registered is not None:
+        return registered
+    try:
+        shim = _NATIVE_RHS_CACHE[dynamics_func]
+        _NATIVE_RHS_CACHE.move_to_end(dynamics_func)
+        return shim
+    except (KeyError, TypeError):
+        pass
+
+    try:
+        from numba import carray, cfunc, njit, types
+        from numba.core.errors import NumbaError, UnsupportedBytecodeError
+    except ImportError:
+        return None
+
+    if hasattr(dynamics_func, 'py_func'):
+        # Already-jitted functions are used as they are.
+        jitted = dynamics_func
+    elif isinstance(dynamics_func, FunctionType):
+        jitted = njit(dynamics_func)
+    else:
+        warnings.warn(
+            f"jit=True needs a plain Python function, got {type(dynamics_func).__name__}; "
+            "using the Python callback instead.",
+            RuntimeWarning, stacklevel=4
+        )
+        return None
+
+    signature = types.void(
+        types.float64, types.CPointer(types.float64), types.CPointer(types.float64), types.intp
+    )
+    try:
+        @cfunc(signature)
+        def shim(t, y_ptr, out_ptr, n):
+            y = carray(y_ptr, (n,))
+            out = carray(out_ptr, (n,))
+            dy = jitted(t, y)
+            for i in range(n):
+                out[i] = dy[i]
+    except (NumbaError, UnsupportedBytecodeError) as err:
+        # Object mode, unsupported calls, ...: keep the regular Python-callback path.
+        warnings.warn(
+            f"dynamics_func could not be compiled with Numba ({type(err).__name__}); "
+            "using the Python callback instead.",
+            RuntimeWarning, stacklevel=4
+        )
+        shim = None
+
+    _cache_native(dynamics_func, shim)
+    return shim
+
+
+def register_rhs(dynamics_func: Callable, native=None):
+    """
+    Registers the compiled form of `dynamics_func` used by `Simulation(jit=True)`.
+
+    With `native=None`, `dynamics_func` is (re)compiled right away and a TypeError
+    is raised if it cannot be, instead of falling back to the Python callback at run
+    time. As Numba freezes the globals a function reads when compiling it, this is
+    also how to pick up new values of those globals. Alternatively pass a
+    hand-written `numba.cfunc` with the signature
+    `void(float64, CPointer(float64), CPointer(float64), intp)` that writes `dy/dt`
+    for the `n`-element state into `out`; `dynamics_func` is then still used for
+    `jit=False` runs and the Python-side fallbacks.
+
+    Register before the first `run` of a Simulation that uses `dynamics_func`, as
+    each Simulation caches the mode objects it has already built.
+
+    Returns the registered cfunc.
+    """
+    if native is None:
+        try:
+            delattr(dynamics_func, _NATIVE_ATTR)
+        except AttributeError:
+            pass
+        try:
+            del _NATIVE_RHS_CACHE[dynamics_func]
+        except (KeyError, TypeError):
+            pass
+        native = _native_rhs(dynamics_func)
+        if native is None:
+            raise TypeError(
+                "dynamics_func could not be compiled with Numba in nopython mode "
+                "(or Numba is not installed)."
+            )
+        return native
+
+    from numba import types
+    signature = types.void(
+        types.float64, types.CPointer(types.float64), types.CPointer(types.float64), types.intp
+    )
+    if getattr(native, '_sig', None) != signature:
+        raise TypeError(f"native must be a numba.cfunc with signature {signature}.")
+    try:
+        setattr(dynamics_func, _NATIVE_ATTR, native)
+    except AttributeError:
+        raise TypeError("dynamics_func must be a plain function to register a cfunc for it.") from None
+    return native
+
+
+def _cast_result(result, mode: str, dtype: np.dtype):
+    """
+    Casts the trajectory in one solver result to `dtype`, leaving times untouched.
+    """
+    if mode == 'Adaptive':
+        trajectory, times = result
+        return trajectory.astype(dtype, copy=False), times
+    return result.astype(dtype, copy=False)
+
+
 class Simulation:
     """
     Configures and executes a numerical simulation of a dynamical system.
     """
+    # Slots instead of a per-instance __dict__: sweeps create many Simulation objects.
+    __slots__ = ('dynamics_func', 'initial_state', 't_span', 'dt', '_abstol', '_reltol', '_jit', '_native', '_mode_cache')
+
     def __init__(self,
-                 dynamics_func: Callable[[float, np.ndarray], Union[List[float], np.ndarray]],
+                 dynamics_func: Callable[[float, np.ndarray], Union[List[float], Tuple[float, ...], np.ndarray]],
                  initial_state: Union[List[float], np.ndarray],
                  t_span: Tuple[float, float],
-                 dt: float):
+                 dt: float,
+                 abstol: float = 1e-6,
+                 reltol: float = 1e-3,
+                 jit: bool = False):
         """
         Initializes and validates the simulation parameters.
+
+        `abstol` and `reltol` are the default tolerances for adaptive runs; they can
+        still be overridden per call through `run(..., abstol=..., reltol=...)`.
+
+        With `jit=True` (and Numba installed), Explicit and Adaptive runs first try to
+        compile `dynamics_func` to native code, so the Rust core calls it directly
+        without the GIL. Write the RHS in Numba's nopython subset (NumPy arithmetic,
+        no Python objects) to get this fast path; other functions fall back to the
+        Python callback with a RuntimeWarning. The fast path is opt-in because the
+        compiled function does not behave exactly like the Python one:
+
+        - Module globals and closure variables are frozen at their values when the
+          function is compiled, and the compiled form is kept for later runs, so
+          reassigning them afterwards has no effect (call `register_rhs` again to
+          recompile).
+        - Exceptions raised inside a compiled RHS are not propagated; the run carries
+          on, so keep `jit=False` while debugging a new system.
+        - Each new dynamics function pays Numba's compile time on its first run.
+
+        `initial_state` may also be a 2D array of shape `(n_runs, n_dims)`, one
+        initial condition per row; `run` then integrates the whole ensemble in one
+        call and returns a list with one result per row (see `run_batch`).
+
+        `dynamics_func` may return an array, a list or a tuple. Returning a plain
+        tuple such as `(dx, dy, dz)` avoids allocating an array on every call, both
+        in the Python callback and in the compiled fast path. The core copies the
+        returned values before the next call, so returning one preallocated buffer
+        is also safe, though it keeps the function out of the compiled path.
         """
         if not callable(dynamics_func):
             raise TypeError("The dynamics function must be callable.")
         self.dynamics_func = dynamics_func
 
-        initial_state_np = np.asarray(initial_state, dtype=np.float64)
-        if initial_state_np.ndim != 1:
-            raise ValueError("The initial state must be a 1D array.")
+        if (isinstance(initial_state, np.ndarray) and initial_state.dtype == np.float64
+                and initial_state.flags.c_contiguous):
+            # Already in the layout the Rust core needs: use it as-is.
+            initial_state_np = initial_state
+        else:
+            if isinstance(initial_state, np.ndarray) and initial_state.dtype != np.float64:
+                warnings.warn(
+                    f"initial_state has dtype {initial_state.dtype}; it is copied to float64.",
+                    RuntimeWarning, stacklevel=2
+                )
+            initial_state_np = np.ascontiguousarray(initial_state, dtype=np.float64)
+        if initial_state_np.ndim not in (1, 2):
+            raise ValueError("The initial state must be a 1D array, or a 2D array of shape (n_runs, n_dims).")
         self.initial_state = initial_state_np
 
         if not isinstance(t_span, tuple) or len(t_span) != 2:
@@ -37,50 +243,205 @@ class Simulation:
         if not isinstance(dt, (int, float)) or dt <= 0:
             raise ValueError("The time step 'dt' must be a positive number.")
         self.dt = float(dt)
+        self._abstol = float(abstol)
+        self._reltol = float(reltol)
+        self._jit = bool(jit)
+        # Compiled RHS used by the last run; held here so its code outlives the solve.
+        self._native = None
+        self._mode_cache = None
 
-    def run(self, solver: str = 'RK45', mode: str = 'Adaptive', **kwargs) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    @classmethod
+    def from_validated(cls,
+                       dynamics_func: Callable[[float, np.ndarray], Union[List[float], Tuple[float, ...], np.ndarray]],
+                       initial_state: np.ndarray,
+                       t_span: Tuple[float, float],
+                       dt: float,
+                       abstol: float = 1e-6,
+                       reltol: float = 1e-3,
+                       jit: bool = False) -> Simulation:
         """
-        Runs the simulation and returns the raw trajectory data.
+        Builds a Simulation from inputs the caller has already standardized, skipping
+        the checks in `__init__`. Intended for parameter sweeps that create many
+        simulations from the same known-good pieces.
 
-        Returns:
-            - For adaptive solvers: A tuple of (trajectory, times).
-            - For fixed-step solvers: The trajectory array.
+        `initial_state` must be a 1D (or 2D ensemble) C-contiguous float64 NumPy array, `t_span` a `(t_start, t_end)`
+        tuple with `t_end > t_start` and `dt` a positive float; these are not checked.
+        """
+        obj = cls.__new__(cls)
+        obj.dynamics_func = dynamics_func
+        obj.initial_state = initial_state
+        obj.t_span = t_span
+        obj.dt = dt
+        obj._abstol = abstol
+        obj._reltol = reltol
+        obj._jit = jit
+        obj._native = None
+        obj._mode_cache = None
+        return obj
+
+    def _prepare(self, solver: Union[str, Solver], mode: str, kwargs: dict):
+        """
+        Resolves `solver` and `mode` into a Rust solver instance and its mode object.
+
+        The mode object of the last configuration is cached, so repeated runs of the
+        same Simulation skip rebuilding it, while a sweep that reassigns settings
+        does not accumulate one per configuration. The key holds the identity of
+        the dynamics and initial state; the entry keeps both alive, so their ids
+        cannot be reused by new objects while it is cached.
         """
-        solver_map = {
-            'RK45': rust_core.Rk45,
-            'RK4': rust_core.Rk4,
-            'Euler': rust_core.Euler
-        }
-        solver_class = solver_map.get(solver)
-        if solver_class is None:
-            raise ValueError(f"Solver '{solver}' not supported. Use one of {list(solver_map.keys())}")
+        if rust_core is None:
+            raise ImportError("Simulation requires the compiled dynamixplore._core extension.")
 
-        rust_solver = solver_class()
+        if not isinstance(solver, Solver):
+            try:
+                solver = Solver(_SOLVER_NAMES.index(solver))
+            except ValueError:
+                raise ValueError(f"Solver '{solver}' not supported. Use one of {list(_SOLVER_NAMES)}") from None
+
+        rust_solver = _SOLVER_TABLE[solver]
+
+        abstol = kwargs.get('abstol', self._abstol)
+        reltol = kwargs.get('reltol', self._reltol)
+        key = (solver, mode, abstol, reltol, id(self.dynamics_func), id(self.initial_state),
+               self.t_span, self.dt, self._jit)
+        cached = self._mode_cache
+        if cached is not None and cached[0] == key:
+            _, mode_obj, self._native, _ = cached
+            return rust_solver, mode_obj
 
         t_start, t_end = self.t_span
-        params = {
-            "dynamics": self.dynamics_func,
-            "initial_state": self.initial_state,
-            "t_start": t_start,
-            "t_end": t_end,
-            "h": self.dt
-        }
+        native = None
+        if self._jit and mode in ('Adaptive', 'Explicit'):
+            native = _native_rhs(self.dynamics_func)
+        if native is not None:
+            # The compiled shim cannot report a short result, so check the output
+            # length once here with the Python function.
+            y0 = self.initial_state if self.initial_state.ndim == 1 else self.initial_state[0]
+            n_out = len(self.dynamics_func(t_start, y0.copy()))
+            if n_out != y0.shape[0]:
+                raise ValueError(
+                    f"dynamics_func returned {n_out} values for a {y0.shape[0]}-dimensional state."
+                )
+        self._native = native
+
+        # Built positionally, in the order of the Rust constructors, so PyO3 does no
+        # keyword lookups. With a compiled RHS the mode calls it by address instead.
+        rhs = native.address if native is not None else self.dynamics_func
+        args = (rhs, self.initial_state, t_start, t_end, self.dt)
 
         if mode == 'Adaptive':
-            if solver != 'RK45':
+            if solver is not Solver.RK45:
                 raise ValueError("Adaptive mode is only compatible with the RK45 solver.")
-            params.update({
-                "abstol": kwargs.get('abstol', 1e-6),
-                "reltol": kwargs.get('reltol', 1e-3)
-            })
-            mode_obj = rust_core.Adaptive(**params)
+            factory = rust_core.Adaptive.from_cfunc if native is not None else rust_core.Adaptive
+            mode_obj = factory(*args, abstol, reltol)
         elif mode == 'Explicit':
-            mode_obj = rust_core.Explicit(**params)
+            factory = rust_core.Explicit.from_cfunc if native is not None else rust_core.Explicit
+            mode_obj = factory(*args)
         elif mode == 'Implicit':
-            mode_obj = rust_core.Implicit(**params)
+            mode_obj = rust_core.Implicit(*args)
         else:
             raise ValueError(f"Mode '{mode}' not supported.")
 
-        # FIX: Return the raw result directly instead of an Analysis object.
+        self._mode_cache = (key, mode_obj, native, (self.dynamics_func, self.initial_state))
+        return rust_solver, mode_obj
+
+    def run(self, solver: Union[str, Solver] = Solver.RK45, mode: str = 'Adaptive', return_analysis: bool = False, dtype: np.dtype = np.float64, **kwargs) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray], List[Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]], Analysis, List[Analysis]]:
+        """
+        Runs the simulation and returns the raw trajectory data.
+
+        When `dynamics_func` was compiled to native code (see `jit` in `__init__`),
+        the integration runs with the GIL released. Otherwise the GIL is held for
+        the whole run because every RHS evaluation calls the Python function, and
+        concurrent runs from several threads interleave rather than run in parallel.
+
+        Returns:
+            - For adaptive solvers: A tuple of (trajectory, times).
+            - For fixed-step solvers: The trajectory array.
+            For a 2D `initial_state`, every mode returns a list with one of these
+            results per row, as `run_batch` does (adaptive rows take their own
+            steps, so their trajectories cannot be stacked in general).
+
+            With `return_analysis=True` the result is wrapped in an `Analysis`
+            instead (a list of them for a 2D `initial_state`).
+
+        The integration itself always runs in float64. Passing `dtype=np.float32`
+        casts the returned trajectories, halving their memory for plotting or
+        storage; time arrays stay float64. `Analysis` needs float64 data, so a
+        different `dtype` cannot be combined with `return_analysis`.
+        """
+        dtype = np.dtype(dtype)
+        if return_analysis and dtype != np.float64:
+            raise ValueError("return_analysis requires dtype=np.float64.")
+
+        if self.initial_state.ndim == 2:
+            results = self.run_batch(self.initial_state, solver, mode, **kwargs)
+            if return_analysis:
+                return [self._as_analysis(result, mode) for result in results]
+            return [_cast_result(result, mode, dtype) for result in results]
+
+        rust_solver, mode_obj = self._prepare(solver, mode, kwargs)
+
+        # Raw arrays by default; building an Analysis is opt-in.
         result = rust_solver.solve(mode_obj)
-        return result
+        if return_analysis:
+            return self._as_analysis(result, mode)
+        return _cast_result(result, mode, dtype)
+
+    def _as_analysis(self, result, mode: str) -> Analysis:
+        """
+        Wraps the output of one solve in an `Analysis`.
+        """
+        # Imported lazily: most runs return raw arrays and never need it.
+        from dynamixplore.analysis import Analysis
+
+        if mode == 'Adaptive':
+            trajectory, times = result
+            return Analysis(trajectory, t=times)
+        return Analysis(result, dt=self.dt)
+
+    def invariant_measure(self, epsilon: float, dims: Tuple[int, int] = (0, 1), sparse: bool = False, **kwargs) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Integrates with adaptive RK45 and box-counts the projection onto `dims` as the
+        solver goes, so the trajectory is never stored. Gives the same result as
+        `self.run(return_analysis=True).invariant_measure(epsilon, dims, sparse)` with
+        memory proportional to the number of occupied boxes instead of the run length.
+
+        `kwargs` (`abstol`, `reltol`) are handled as in `run`.
+        """
+        if len(dims) != 2:
+            raise ValueError("Invariant measure projection only supports 2D.")
+        if self.initial_state.ndim != 1:
+            raise ValueError("invariant_measure needs a single 1D initial state.")
+
+        from dynamixplore.analysis import _boxes_to_grid
+
+        rust_solver, mode_obj = self._prepare(Solver.RK45, 'Adaptive', kwargs)
+        x_idx, y_idx, counts = rust_solver.solve_and_histogram(mode_obj, epsilon, tuple(dims))
+        return _boxes_to_grid(x_idx, y_idx, counts, epsilon, sparse)
+
+    def run_batch(self, initial_states: np.ndarray, solver: Union[str, Solver] = Solver.RK45, mode: str = 'Adaptive', **kwargs) -> List[Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]]:
+        """
+        Runs the simulation once per row of `initial_states` (shape `(n_runs, n_dims)`)
+        with a single call into the Rust core, keeping the dynamics, time span and
+        solver settings of this Simulation. Useful for sweeps over initial conditions.
+
+        With a compiled `dynamics_func` (see `jit`), the rows are integrated in
+        parallel across threads with the GIL released; Python callbacks run the rows
+        one after another.
+
+        Returns:
+            A list with one entry per row, each exactly what `run` would return.
+        """
+        initial_states = np.ascontiguousarray(initial_states, dtype=np.float64)
+        if initial_states.ndim != 2:
+            raise ValueError("The initial states must be a 2D array of shape (n_runs, n_dims).")
+        # The RHS was only checked against this Simulation's state width, and a
+        # compiled RHS would read past its result on any other.
+        if initial_states.shape[1] != self.initial_state.shape[-1]:
+            raise ValueError(
+                f"The initial states have {initial_states.shape[1]} columns, but this "
+                f"Simulation's state has {self.initial_state.shape[-1]} dimensions."
+            )
+
+        rust_solver, mode_obj = self._prepare(solver, mode, kwargs)
+        return rust_solver.solve_batch(mode_obj, initial_states)
@@ -7,7 +7,8 @@ from typing import Optional, List, Tuple
 def plot_phase_portrait(
     trajectory: np.ndarray,
     dims: Tuple[int, ...] = (0, 1, 2),
-    title: str = "Phase Portrait"
+    title: str = "Phase Portrait",
+    max_points: Optional[int] = 50_000
 ) -> go.Figure:
     """
     Creates an interactive 2D or 3D phase portrait of the trajectory.
@@ -17,6 +18,9 @@ def plot_phase_portrait(
         dims (Tuple[int, ...]): A tuple of 2 or 3 integers specifying the
                                 dimensions (columns) to plot.
         title (str): The title for the plot.
+        max_points (Optional[int]): Longer trajectories are downsampled to this many
+                                    evenly spaced points before plotting, since
+                                    Plotly serializes every point. None plots all.
 
     Returns:
         go.Figure: An interactive Plotly figure object.
@@ -27,12 +31,23 @@ def plot_phase_portrait(
     if max(dims) >= trajectory.shape[1]:
         raise ValueError(f"Invalid dimension index in {dims}. Trajectory only has {trajectory.shape[1]} dimensions.")
 
+    if max_points is not None:
+        if max_points < 2:
+            raise ValueError("max_points must be at least 2.")
+        if trajectory.shape[0] > max_points:
+            idx = np.linspace(0, trajectory.shape[0] - 1, max_points).astype(np.intp)
+            trajectory = trajectory[idx]
+
+    # One gather of the requested columns into a (len(dims), n_points) C-contiguous
+    # array, so each axis handed to Plotly is a contiguous row, not a strided column.
+    columns = trajectory.T[list(dims)]
+
     fig = go.Figure()
 
     if len(dims) == 2:
         fig.add_trace(go.Scatter(
-            x=trajectory[:, dims[0]],
-            y=trajectory[:, dims[1]],
+            x=columns[0],
+            y=columns[1],
             mode='lines',
             line=dict(width=1.5, color='royalblue')
         ))
@@ -41,10 +56,12 @@ def plot_phase_portrait(
             yaxis_title=f"Dimension {dims[1]}"
         )
     else: # 3D case
+        # float32 is plenty for screen coordinates and halves the payload.
+        points = columns.astype(np.float32)
         fig.add_trace(go.Scatter3d(
-            x=trajectory[:, dims[0]],
-            y=trajectory[:, dims[1]],
-            z=trajectory[:, dims[2]],
+            x=points[0],
+            y=points[1],
+            z=points[2],
             mode='lines',
             line=dict(width=1, color='crimson')
         ))
@@ -70,7 +87,8 @@ def plot_invariant_measure(
     Visualizes a 2D projection of the invariant measure as a heatmap.
 
     Args:
-        histogram (np.ndarray): A 2D NumPy array of counts from Analysis.invariant_measure.
+        histogram (np.ndarray): A 2D NumPy array (or SciPy sparse matrix) of counts
+                                from Analysis.invariant_measure.
         x_bins (np.ndarray): A 1D array of the bin edges for the x-axis.
         y_bins (np.ndarray): A 1D array of the bin edges for the y-axis.
         title (str): The title for the plot.
@@ -78,8 +96,15 @@ def plot_invariant_measure(
     Returns:
         go.Figure: An interactive Plotly figure object.
     """
+    # Transpose to match standard (x, y) orientation. The transposed copy is made
+    # once, C-contiguous, instead of letting the serializer walk a strided view.
+    if hasattr(histogram, 'toarray'):  # sparse=True result from invariant_measure
+        z = histogram.T.toarray()
+    else:
+        z = np.ascontiguousarray(histogram.T)
+
     fig = go.Figure(data=go.Heatmap(
-        z=histogram.T, # Transpose to match standard (x, y) orientation
+        z=z,
         x=x_bins,
         y=y_bins,
         colorscale='Viridis',
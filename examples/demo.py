@@ -1,15 +1,15 @@
 import numpy as np
 import dynamixplore as dx
 
-def lorenz_system(t: float, state: np.ndarray) -> np.ndarray:
+def lorenz_system(t: float, state: np.ndarray) -> tuple:
     sigma = 10.0
     rho = 28.0
     beta = 8.0 / 3.0
-    x, y, z = state
+    x, y, z = state[0], state[1], state[2]
     dx_dt = sigma * (y - x)
     dy_dt = x * (rho - z) - y
     dz_dt = x * y - beta * z
-    return np.array([dx_dt, dy_dt, dz_dt])
+    return dx_dt, dy_dt, dz_dt
 
 def main():
     sim = dx.Simulation(
@@ -1,9 +1,35 @@
 # In tests/conftest.py
 # This file defines shared fixtures for the test suite.
 
+import math
 import pytest
 import numpy as np
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _lorenz_system(t, state):
+    sigma = 10.0
+    rho = 28.0
+    beta = 8.0 / 3.0
+
+    x, y, z = state[0], state[1], state[2]
+    dx_dt = sigma * (y - x)
+    dy_dt = x * (rho - z) - y
+    dz_dt = x * y - beta * z
+    return dx_dt, dy_dt, dz_dt
+
+
+# Compiled once at module level and cached on disk, so every test (and every
+# pytest session) reuses the same native code. Without Numba the plain
+# function is used.
+if njit is not None:
+    _lorenz_system = njit(cache=True, fastmath=True)(_lorenz_system)
+
+
 @pytest.fixture(scope="session")
 def lorenz_system_fixture():
     """
@@ -11,16 +37,34 @@ def lorenz_system_fixture():
     `scope="session"` means this function is only run once for the entire
     test session, making it very efficient.
     """
-    def lorenz_system(t, state):
+    return _lorenz_system
+
+
+@pytest.fixture(scope="session")
+def lorenz_jacobian_fixture():
+    """
+    Provides the analytic Jacobian of the Lorenz system, J[i, j] = ∂f_i/∂y_j.
+    """
+    def lorenz_jacobian(t, state):
         sigma = 10.0
         rho = 28.0
         beta = 8.0 / 3.0
-        
-        x, y, z = state
-        dx_dt = sigma * (y - x)
-        dy_dt = x * (rho - z) - y
-        dz_dt = x * y - beta * z
-        return np.array([dx_dt, dy_dt, dz_dt])
-        
-    return lorenz_system
 
+        x, y, z = state[0], state[1], state[2]
+        return np.array([
+            [-sigma, sigma, 0.0],
+            [rho - z, -1.0, -x],
+            [y, x, -beta],
+        ])
+
+    return lorenz_jacobian
+
+
+@pytest.fixture(scope="session")
+def sho_period_fixture():
+    """
+    Provides one period of the simple harmonic oscillator, T = 2π, together with
+    its exact state [cos(T), -sin(T)] for the initial state [1.0, 0.0].
+    """
+    period = 2 * math.pi
+    return period, np.array([math.cos(period), -math.sin(period)])
@@ -18,7 +18,7 @@ def test_lyapunov_spectrum_lorenz(lorenz_system_fixture):
         t_span=(0.0, 100.0), # A reasonably long run to get onto the attractor
         dt=0.01
     )
-    analysis_obj = sim.run(solver='RK45', mode='Adaptive')
+    analysis_obj = sim.run(solver='RK45', mode='Adaptive', return_analysis=True)
 
     # Step 2: Call the analysis method on the resulting object.
     # A shorter run for testing purposes, but long enough for convergence.
@@ -36,6 +36,86 @@ def test_lyapunov_spectrum_lorenz(lorenz_system_fixture):
     # Assert that the sum of exponents is negative (for a dissipative system).
     assert np.sum(spectrum) < 0
 
+def test_lyapunov_spectrum_builtin_lorenz():
+    """
+    Tests the compiled Lorenz fast path (`kind="lorenz"`), which needs no Python
+    dynamics callback, against the same canonical largest exponent.
+    """
+    trajectory = np.array([[1.0, 1.0, 1.0]])
+    analysis_obj = dx.Analysis(trajectory=trajectory, dt=0.01)
+
+    spectrum, history = analysis_obj.lyapunov_spectrum(
+        t_transient=10.0,
+        t_total=2000.0,
+        t_reorth=1.0,
+        kind="lorenz"
+    )
+
+    assert spectrum[0] == pytest.approx(0.906, abs=0.1)
+    assert np.sum(spectrum) < 0
+    assert history.shape == (2000, 3)
+
+    with pytest.raises(ValueError, match="Unknown built-in system"):
+        analysis_obj.lyapunov_spectrum(kind="duffing")
+
+def test_lyapunov_spectrum_with_jacobian(lorenz_system_fixture, lorenz_jacobian_fixture):
+    """
+    Supplying the analytic Jacobian evolves the variational equation directly and
+    must reproduce the canonical Lorenz exponents.
+    """
+    analysis_obj = dx.Analysis(trajectory=np.array([[1.0, 1.0, 1.0]]), dt=0.01)
+    spectrum, history = analysis_obj.lyapunov_spectrum(
+        dynamics=lorenz_system_fixture,
+        jacobian=lorenz_jacobian_fixture,
+        t_transient=10.0,
+        t_total=1000.0,
+        t_reorth=1.0
+    )
+
+    assert spectrum[0] == pytest.approx(0.906, abs=0.1)
+    # The exponents of the Lorenz system sum to the trace of J, -(sigma + 1 + beta).
+    assert np.sum(spectrum) == pytest.approx(-(10.0 + 1.0 + 8.0 / 3.0), abs=0.5)
+    assert history.shape == (1000, 3)
+
+def test_lyapunov_spectrum_cache(lorenz_system_fixture):
+    """
+    Identical calls are served from the cache until `clear_cache` is called.
+    """
+    calls = []
+    def counting_lorenz(t, state):
+        calls.append(t)
+        return lorenz_system_fixture(t, state)
+
+    analysis_obj = dx.Analysis(trajectory=np.array([[1.0, 1.0, 1.0]]), dt=0.01)
+    params = dict(dynamics=counting_lorenz, t_transient=1.0, t_total=5.0, t_reorth=1.0)
+
+    spectrum, history = analysis_obj.lyapunov_spectrum(**params)
+    n_calls = len(calls)
+    assert n_calls > 0
+
+    spectrum[0] = np.nan  # Mutating a result must not corrupt the cache.
+    cached_spectrum, cached_history = analysis_obj.lyapunov_spectrum(**params)
+    assert len(calls) == n_calls
+    assert np.all(np.isfinite(cached_spectrum))
+    assert np.array_equal(cached_history, history)
+
+    analysis_obj.clear_cache()
+    analysis_obj.lyapunov_spectrum(**params)
+    assert len(calls) == 2 * n_calls
+
+    class UnhashableLorenz:
+        """Defines `__eq__` without `__hash__`, so it cannot be a cache key."""
+        def __eq__(self, other):
+            return isinstance(other, UnhashableLorenz)
+
+        def __call__(self, t, state):
+            return counting_lorenz(t, state)
+
+    params['dynamics'] = UnhashableLorenz()
+    analysis_obj.lyapunov_spectrum(**params)
+    analysis_obj.lyapunov_spectrum(**params)
+    assert len(calls) == 4 * n_calls
+
 def test_permutation_entropy():
     """
     Tests permutation entropy on predictable and random signals.
@@ -57,6 +137,48 @@ def test_permutation_entropy():
     pe_random = analysis_random.permutation_entropy(dim=0, m=3, tau=1)
     assert pe_random > 0.95
 
+@pytest.mark.parametrize("m, tau", [(3, 1), (4, 2), (5, 3)])
+def test_permutation_entropy_numpy_matches_rust(m, tau):
+    """
+    The NumPy fallback must agree with the Rust kernel, including on tied values.
+    """
+    from dynamixplore.analysis import _perm_entropy_numpy
+
+    np.random.seed(0)
+    signal = np.round(np.random.rand(2000), 1)  # Rounding forces ties.
+    analysis_obj = dx.Analysis(trajectory=signal.reshape(-1, 1), dt=0.1)
+
+    expected = analysis_obj.permutation_entropy(dim=0, m=m, tau=tau)
+    assert _perm_entropy_numpy(signal, m, tau) == pytest.approx(expected, abs=1e-12)
+
+@pytest.mark.parametrize("m, tau", [(3, 1), (4, 2), (5, 3), (10, 1)])
+def test_permutation_entropy_numba_matches_numpy(m, tau):
+    """
+    The Numba fallback must agree with the NumPy fallback, including on tied values.
+    """
+    pytest.importorskip("numba")
+    from dynamixplore.analysis import _perm_entropy_nb, _perm_entropy_numpy
+
+    np.random.seed(1)
+    signal = np.round(np.random.rand(2000), 1)  # Rounding forces ties.
+    assert _perm_entropy_nb(signal, m, tau) == pytest.approx(
+        _perm_entropy_numpy(signal, m, tau), abs=1e-12
+    )
+
+def test_permutation_entropy_grid():
+    """
+    The grid sweep must match one `permutation_entropy` call per (m, tau) pair.
+    """
+    np.random.seed(2)
+    analysis_obj = dx.Analysis(trajectory=np.random.rand(1500, 2), dt=0.1)
+    ms, taus = (3, 4, 5), (1, 2)
+
+    grid = analysis_obj.permutation_entropy_grid(dim=1, ms=ms, taus=taus)
+    assert grid.shape == (len(ms), len(taus))
+    for i, m in enumerate(ms):
+        for j, tau in enumerate(taus):
+            assert grid[i, j] == pytest.approx(analysis_obj.permutation_entropy(dim=1, m=m, tau=tau), abs=1e-12)
+
 def test_invariant_measure():
     """
     Tests that the invariant measure correctly bins a simple trajectory.
@@ -84,6 +206,16 @@ def test_invariant_measure():
     
     assert np.array_equal(hist, expected_hist)
 
+    # The sparse form must describe the same grid and share the same bin edges.
+    sparse_hist, sparse_x_bins, sparse_y_bins = analysis_obj.invariant_measure(
+        epsilon=1.0, dims=(0, 1), sparse=True
+    )
+    assert sparse_hist.shape == expected_hist.shape
+    assert sparse_hist.nnz == 2
+    assert np.array_equal(sparse_hist.toarray(), expected_hist)
+    assert np.array_equal(sparse_x_bins, x_bins)
+    assert np.array_equal(sparse_y_bins, y_bins)
+
 def test_analysis_error_handling():
     """
     Ensures that analysis functions raise appropriate errors for invalid input.
@@ -98,3 +230,29 @@ def test_analysis_error_handling():
     # Test that providing a 1D array to the Analysis constructor fails
     with pytest.raises(ValueError, match="Trajectory must be a 2D NumPy array"):
         dx.Analysis(trajectory=np.array([1.0, 2.0, 3.0]), dt=0.1)
+
+    # Box indices beyond the 32-bit range are rejected rather than merged
+    with pytest.raises(ValueError, match="32-bit"):
+        dx.Analysis(trajectory=np.array([[0.0, 0.0], [1e3, 1e3]]), dt=0.1).invariant_measure(
+            epsilon=1e-7, sparse=True
+        )
+
+    # The stored trajectory is read-only, so it cannot drift from the analysed copy
+    with pytest.raises(ValueError, match="read-only"):
+        analysis_obj.trajectory[:, 0] = 0.0
+
+def test_to_dataframe_does_not_alias_analysis():
+    """
+    Editing the frame returned by `to_dataframe` must not change later results.
+    """
+    pytest.importorskip("pandas")
+    np.random.seed(3)
+    analysis_obj = dx.Analysis(trajectory=np.random.rand(500, 2), dt=0.1)
+    expected = analysis_obj.permutation_entropy(dim=0)
+
+    df = analysis_obj.to_dataframe()
+    df.iloc[:, 0] = -1.0
+    df.iloc[:, 1] = 0.0
+
+    assert analysis_obj.permutation_entropy(dim=0) == expected
+    assert analysis_obj.to_dataframe()['time'].iloc[-1] == pytest.approx(49.9)
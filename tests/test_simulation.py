@@ -1,5 +1,6 @@
 # This file contains tests for the numerical integrators.
 
+import math
 import pytest
 import numpy as np
 import dynamixplore as dx
@@ -15,15 +16,16 @@ import dynamixplore as dx
 
 def harmonic_oscillator(t, state):
     """Defines the simple harmonic oscillator system."""
-    y1, y2 = state
-    return np.array([y2, -y1])
+    y1, y2 = state[0], state[1]
+    return y2, -y1
 
-def test_solve_rk4_explicit_on_sho():
+def test_solve_rk4_explicit_on_sho(sho_period_fixture):
     """
     Tests the fixed-step RK4 solver against the known solution for the
     simple harmonic oscillator.
     """
-    t_start, t_end, h = 0.0, 2 * np.pi, 0.01
+    t_end, expected_state = sho_period_fixture
+    t_start, h = 0.0, 0.01
     
     # Use the Simulation class to configure and run the simulation
     sim = dx.Simulation(
@@ -32,21 +34,21 @@ def test_solve_rk4_explicit_on_sho():
         t_span=(t_start, t_end),
         dt=h
     )
-    analysis_obj = sim.run(solver='RK4', mode='Explicit')
+    analysis_obj = sim.run(solver='RK4', mode='Explicit', return_analysis=True)
 
     # The final state should be very close to the initial state after one full period.
     final_state = analysis_obj.trajectory[-1]
-    expected_state = np.array([np.cos(t_end), -np.sin(t_end)])
 
     # pytest.approx handles floating-point comparisons gracefully.
     assert final_state == pytest.approx(expected_state, abs=1e-5)
 
-def test_solve_euler_explicit_on_sho():
+def test_solve_euler_explicit_on_sho(sho_period_fixture):
     """
     Tests the fixed-step Euler solver. We expect it to be much less accurate
     than RK4, so we use a larger tolerance.
     """
-    t_start, t_end, h = 0.0, 2 * np.pi, 0.001 # Smaller step size needed for stability
+    t_end, expected_state = sho_period_fixture
+    t_start, h = 0.0, 0.001 # Smaller step size needed for stability
 
     sim = dx.Simulation(
         dynamics_func=harmonic_oscillator,
@@ -54,10 +56,9 @@ def test_solve_euler_explicit_on_sho():
         t_span=(t_start, t_end),
         dt=h
     )
-    analysis_obj = sim.run(solver='Euler', mode='Explicit')
+    analysis_obj = sim.run(solver='Euler', mode='Explicit', return_analysis=True)
 
     final_state = analysis_obj.trajectory[-1]
-    expected_state = np.array([np.cos(t_end), -np.sin(t_end)])
 
     # Euler is a first-order method, so the error will be larger.
     assert final_state == pytest.approx(expected_state, abs=1e-2)
@@ -74,12 +75,12 @@ def test_solve_rk45_adaptive_on_sho():
         t_span=(t_start, t_end),
         dt=h_init
     )
-    analysis_obj = sim.run(solver='RK45', mode='Adaptive')
+    analysis_obj = sim.run(solver='RK45', mode='Adaptive', return_analysis=True)
 
     final_state = analysis_obj.trajectory[-1]
     # The final time will not be exactly t_end, so we use the last time step from the solver.
     final_time = analysis_obj.t[-1]
-    expected_state = np.array([np.cos(final_time), -np.sin(final_time)])
+    expected_state = np.array([math.cos(final_time), -math.sin(final_time)])
 
     assert final_state == pytest.approx(expected_state, abs=1e-7)
 
@@ -105,3 +106,199 @@ def test_implicit_solvers():
         sim.run(solver='Euler', mode='Implicit')
     except NotImplementedError:
         pytest.fail("Implicit Euler solver incorrectly raised NotImplementedError.")
+
+def test_solver_enum_matches_string_names():
+    """
+    `Simulation.run` accepts `dx.Solver` members interchangeably with their names.
+    """
+    sim = dx.Simulation(
+        dynamics_func=harmonic_oscillator,
+        initial_state=[1.0, 0.0],
+        t_span=(0.0, 1.0),
+        dt=0.1
+    )
+    by_name = sim.run(solver='RK4', mode='Explicit')
+    by_enum = sim.run(solver=dx.Solver.RK4, mode='Explicit')
+    assert np.array_equal(by_name, by_enum)
+
+    with pytest.raises(ValueError, match="not supported"):
+        sim.run(solver='RK5', mode='Explicit')
+
+def test_run_batch_matches_individual_runs():
+    """
+    `run_batch` must give the same trajectories as one `run` per initial state.
+    """
+    initial_states = np.array([[1.0, 0.0], [0.0, 1.0], [0.5, -0.5]])
+    sim = dx.Simulation(
+        dynamics_func=harmonic_oscillator,
+        initial_state=initial_states[0],
+        t_span=(0.0, 1.0),
+        dt=0.1
+    )
+
+    batch = sim.run_batch(initial_states, solver='RK4', mode='Explicit')
+    assert len(batch) == len(initial_states)
+    for x0, trajectory in zip(initial_states, batch):
+        single = dx.Simulation(harmonic_oscillator, x0, (0.0, 1.0), 0.1).run(solver='RK4', mode='Explicit')
+        assert np.array_equal(trajectory, single)
+
+    adaptive_batch = sim.run_batch(initial_states, solver='RK45', mode='Adaptive')
+    for x0, (trajectory, times) in zip(initial_states, adaptive_batch):
+        assert np.array_equal(trajectory[0], x0)
+        assert times[-1] == pytest.approx(1.0)
+
+    with pytest.raises(ValueError, match="columns"):
+        sim.run_batch(np.zeros((2, 3)), solver='RK4', mode='Explicit')
+
+def test_ensemble_initial_state():
+    """
+    A 2D initial state runs the whole ensemble and returns one result per row,
+    whatever the mode.
+    """
+    initial_states = np.array([[1.0, 0.0], [0.0, 1.0], [0.5, -0.5]])
+    sim = dx.Simulation(harmonic_oscillator, initial_states, (0.0, 1.0), 0.1)
+
+    ensemble = sim.run(solver='RK4', mode='Explicit')
+    assert isinstance(ensemble, list) and len(ensemble) == 3
+    for x0, trajectory in zip(initial_states, ensemble):
+        assert trajectory.shape == (11, 2)
+        single = dx.Simulation(harmonic_oscillator, x0, (0.0, 1.0), 0.1).run(solver='RK4', mode='Explicit')
+        np.testing.assert_allclose(trajectory, single)
+
+    adaptive = sim.run(solver='RK45', mode='Adaptive')
+    assert len(adaptive) == 3
+    for x0, (trajectory, times) in zip(initial_states, adaptive):
+        assert np.array_equal(trajectory[0], x0)
+        assert times[-1] == pytest.approx(1.0)
+
+def test_repeated_runs_reuse_mode_object():
+    """
+    Running the same configuration twice gives identical results, and changing a
+    setting between runs is always picked up rather than served from the cache.
+    """
+    sim = dx.Simulation(harmonic_oscillator, [1.0, 0.0], (0.0, 1.0), 0.1, jit=False)
+
+    first = sim.run(solver='RK4', mode='Explicit')
+    assert np.array_equal(first, sim.run(solver='RK4', mode='Explicit'))
+
+    sim.dt = 0.05
+    finer = sim.run(solver='RK4', mode='Explicit')
+    assert finer.shape == (21, 2)
+    np.testing.assert_allclose(finer[-1], first[-1], atol=1e-5)
+
+    sim.initial_state = np.array([0.0, 1.0])
+    expected = dx.Simulation(harmonic_oscillator, [0.0, 1.0], (0.0, 1.0), 0.05, jit=False).run(solver='RK4', mode='Explicit')
+    assert np.array_equal(sim.run(solver='RK4', mode='Explicit'), expected)
+
+    calls = []
+
+    def counting_oscillator(t, state):
+        calls.append(t)
+        return harmonic_oscillator(t, state)
+
+    sim.dynamics_func = counting_oscillator
+    assert np.array_equal(sim.run(solver='RK4', mode='Explicit'), expected)
+    assert calls
+
+def test_run_float32_output():
+    """
+    `dtype=np.float32` casts the trajectory on the way out; times stay float64.
+    """
+    sim = dx.Simulation(harmonic_oscillator, [1.0, 0.0], (0.0, 1.0), 0.1)
+
+    trajectory = sim.run(solver='RK4', mode='Explicit', dtype=np.float32)
+    assert trajectory.dtype == np.float32
+    np.testing.assert_allclose(trajectory, sim.run(solver='RK4', mode='Explicit'), rtol=1e-6)
+
+    trajectory, times = sim.run(solver='RK45', mode='Adaptive', dtype=np.float32)
+    assert trajectory.dtype == np.float32
+    assert times.dtype == np.float64
+
+    with pytest.raises(ValueError):
+        sim.run(solver='RK4', mode='Explicit', dtype=np.float32, return_analysis=True)
+
+def test_fused_invariant_measure_matches_analysis(lorenz_system_fixture):
+    """
+    Box counting while integrating must match box counting the stored trajectory.
+    """
+    sim = dx.Simulation(lorenz_system_fixture, [1.0, 1.0, 1.0], (0.0, 20.0), 0.01)
+
+    hist, x_bins, y_bins = sim.invariant_measure(epsilon=0.5, dims=(0, 2))
+    expected = sim.run(return_analysis=True).invariant_measure(epsilon=0.5, dims=(0, 2))
+
+    assert np.array_equal(hist, expected[0])
+    np.testing.assert_allclose(x_bins, expected[1])
+    np.testing.assert_allclose(y_bins, expected[2])
+
+def test_initial_state_dtype_handling():
+    """
+    A contiguous float64 initial state is used without a copy; other dtypes are
+    converted to float64 with a warning.
+    """
+    x0 = np.array([1.0, 0.0])
+    sim = dx.Simulation(harmonic_oscillator, x0, (0.0, 1.0), 0.1)
+    assert sim.initial_state is x0
+
+    with pytest.warns(RuntimeWarning, match="float32"):
+        sim = dx.Simulation(harmonic_oscillator, x0.astype(np.float32), (0.0, 1.0), 0.1)
+    assert sim.initial_state.dtype == np.float64
+
+@pytest.mark.parametrize("solver, mode", [("RK4", "Explicit"), ("RK45", "Adaptive")])
+def test_jit_matches_python_callback(solver, mode):
+    """
+    The Numba-compiled native RHS path must reproduce the Python-callback path.
+    """
+    pytest.importorskip("numba")
+
+    kwargs = dict(dynamics_func=harmonic_oscillator, initial_state=[1.0, 0.0],
+                  t_span=(0.0, 2 * np.pi), dt=0.01)
+    native = dx.Simulation(**kwargs, jit=True).run(solver=solver, mode=mode)
+    python = dx.Simulation(**kwargs, jit=False).run(solver=solver, mode=mode)
+
+    if mode == "Adaptive":
+        (native, native_t), (python, python_t) = native, python
+        assert native_t == pytest.approx(python_t, abs=1e-12)
+    assert native == pytest.approx(python, abs=1e-12)
+
+
+def test_register_rhs_with_handwritten_cfunc():
+    """
+    A registered cfunc that writes into `out` must drive the same integration as
+    the Python dynamics it stands in for.
+    """
+    numba = pytest.importorskip("numba")
+    signature = numba.types.void(
+        numba.types.float64, numba.types.CPointer(numba.types.float64),
+        numba.types.CPointer(numba.types.float64), numba.types.intp
+    )
+
+    @numba.cfunc(signature)
+    def sho_native(t, y, out, n):
+        out[0] = y[1]
+        out[1] = -y[0]
+
+    def sho(t, state):
+        y1, y2 = state[0], state[1]
+        return y2, -y1
+
+    assert dx.register_rhs(sho, sho_native) is sho_native
+    native = dx.Simulation(sho, [1.0, 0.0], (0.0, 1.0), 0.1, jit=True).run(solver='RK4', mode='Explicit')
+    python = dx.Simulation(sho, [1.0, 0.0], (0.0, 1.0), 0.1, jit=False).run(solver='RK4', mode='Explicit')
+    np.testing.assert_allclose(native, python, rtol=1e-12)
+
+    with pytest.raises(TypeError):
+        dx.register_rhs(sho, numba.cfunc("float64(float64)")(lambda x: x))
+
+def test_jit_rejects_wrong_length_rhs():
+    """
+    A compiled RHS that returns fewer values than the state has must be rejected
+    before the run instead of integrating with a partly written derivative.
+    """
+    pytest.importorskip("numba")
+
+    def short(t, state):
+        return (state[0],)
+
+    sim = dx.Simulation(short, [1.0, 0.0, 0.0], (0.0, 1.0), 0.1, jit=True)
+    with pytest.raises(ValueError, match="returned 1 values"):
+        sim.run(solver='RK4', mode='Explicit')